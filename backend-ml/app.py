@@ -1,91 +1,85 @@
-from flask import Flask, request, jsonify
-import tensorflow as tf
-import numpy as np
+from flask import Flask, request, jsonify, g
+import io
 import json
 import os
 import sys
-from PIL import Image
+import threading
+import time
+import uuid
 from flask_cors import CORS
 
-# Add the project root to the Python path when running directly
-if __name__ == "__main__":
-    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from backend.config import IMAGE_SIZE
+# Add the current directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import image_index
+import inference
+import plate
+import profiling
+import ratelimit
+import shadow
+from metrics import RATE_LIMITED, REJECTED, REQUEST_SECONDS, STAGE_SECONDS, render as render_metrics
+from config import (
+    DATA_DIR,
+    MAX_CONCURRENT_PREDICTIONS,
+    PREDICT_QUEUE_TIMEOUT,
+    PRELOAD_MODEL,
+    RATE_LIMIT_ENABLED,
+    RETRY_AFTER_SECONDS,
+)
+from inference import MODEL_DIR, classify_with_raw
 
 app = Flask(__name__)
 CORS(app)
 
-# Define model directory path
-MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "model")
-os.makedirs(MODEL_DIR, exist_ok=True)
-
-# Create placeholder model files if they don't exist
-if not os.path.exists(os.path.join(MODEL_DIR, "food_model.h5")):
-    print("Warning: Model file not found. Please train the model first.")
-    # Create a simple placeholder model for development
-    simple_model = tf.keras.Sequential([
-        tf.keras.layers.Input(shape=(224, 224, 3)),
-        tf.keras.layers.GlobalAveragePooling2D(),
-        tf.keras.layers.Dense(10, activation='softmax')
-    ])
-    simple_model.compile(optimizer='adam', loss='categorical_crossentropy')
-    simple_model.save(os.path.join(MODEL_DIR, "food_model.h5"))
-
-# Create placeholder label map if it doesn't exist
-if not os.path.exists(os.path.join(MODEL_DIR, "label_map.json")):
-    print("Warning: Label map not found. Creating placeholder.")
-    with open(os.path.join(MODEL_DIR, "label_map.json"), "w") as f:
-        json.dump({"0": "placeholder_food"}, f)
-
-# Create placeholder nutrition DB if it doesn't exist
-if not os.path.exists(os.path.join(MODEL_DIR, "nutrition_db.json")):
-    print("Warning: Nutrition database not found. Creating placeholder.")
-    with open(os.path.join(MODEL_DIR, "nutrition_db.json"), "w") as f:
-        json.dump({"placeholder_food": {"calories": 100}}, f)
-
-# Load model
-model = tf.keras.models.load_model(os.path.join(MODEL_DIR, "food_model.h5"))
-
-# Load label map
-with open(os.path.join(MODEL_DIR, "label_map.json"), "r") as f:
-    label_map = json.load(f)
-
-# Load nutrition DB
-with open(os.path.join(MODEL_DIR, "nutrition_db.json"), "r") as f:
-    nutrition_data = json.load(f)
-
 # Feedback file
 FEEDBACK_PATH = os.path.join(MODEL_DIR, "user_feedback.json")
-# Create data directory for uploaded images
-DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
-os.makedirs(DATA_DIR, exist_ok=True)
-if not os.path.exists(FEEDBACK_PATH):
-    with open(FEEDBACK_PATH, "w") as f:
-        json.dump([], f)
 
-CONFIDENCE_THRESHOLD = 0.7
+# Bound in-flight inferences per worker; excess requests get 503 instead of piling up
+_prediction_slots = threading.BoundedSemaphore(MAX_CONCURRENT_PREDICTIONS)
+# Per-client token buckets; a single client can't take every slot
+_rate_limiter = ratelimit.create_limiter() if RATE_LIMIT_ENABLED else None
+
+# Load shareable data in the pre-fork master; the model itself loads per worker
+if PRELOAD_MODEL:
+    inference.preload()
+
 
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    if profiling.wants_profile(request.headers):
+        g.profiler = profiling.start()
 
-def preprocess_image(image_path):
-    """Load and preprocess image for prediction with RGBA handling."""
-    img = Image.open(image_path)
-    
-    # Convert palette or images with transparency to RGBA, then to RGB
-    if img.mode in ("P", "LA") or (img.mode == "RGBA" and "transparency" in img.info):
-        img = img.convert("RGBA").convert("RGB")
-    else:
-        img = img.convert("RGB")
 
-    img = img.resize(IMAGE_SIZE)
-    img = np.array(img) / 255.0
-    return np.expand_dims(img, axis=0)
+@app.before_request
+def enforce_rate_limit():
+    if _rate_limiter is None:
+        return None
+    limit_class, wait = _rate_limiter.check(request)
+    if wait > 0:
+        # Rejected before the upload is read or a prediction slot is taken
+        RATE_LIMITED.labels(limit_class).inc()
+        return jsonify({"error": "Too many requests, please retry."}), 429, {"Retry-After": ratelimit.retry_after(wait)}
+    return None
 
 
+@app.after_request
+def record_request_metrics(response):
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        response.headers["X-Profile-File"] = profiling.stop(profiler, request.path)
+    if request.url_rule is not None and request.url_rule.rule != "/metrics":
+        REQUEST_SECONDS.labels(request.url_rule.rule, request.method, response.status_code).observe(
+            time.perf_counter() - g.request_started
+        )
+    return response
+
 
 def log_user_feedback(image_name, correct_label, predicted_label, confidence):
-    with open(FEEDBACK_PATH, "r") as f:
-        feedback = json.load(f)
+    feedback = []
+    if os.path.exists(FEEDBACK_PATH):
+        with open(FEEDBACK_PATH, "r") as f:
+            feedback = json.load(f)
     feedback.append({
         "image_name": image_name,
         "correct_label": correct_label,
@@ -102,11 +96,34 @@ def index():
         "message": "BhojanBuddy API is running",
         "endpoints": {
             "/predict": "POST - Upload an image for food recognition",
-            "/feedback": "POST - Submit feedback for predictions"
+            "/feedback": "POST - Submit feedback for predictions",
+            "/healthz": "GET - Liveness check",
+            "/readyz": "GET - Readiness check (model loaded)",
+            "/metrics": "GET - Prometheus metrics"
         }
     })
 
 
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    # Liveness only: never touches the model so it answers during warmup
+    return jsonify({"status": "alive"})
+
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    if not inference.is_ready():
+        inference.start_background_load()
+        return jsonify(inference.status()), 503
+    return jsonify(inference.status())
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    body, content_type = render_metrics()
+    return body, 200, {"Content-Type": content_type}
+
+
 @app.route("/predict", methods=["POST", "GET"])
 def predict():
     if request.method == "GET":
@@ -117,40 +134,61 @@ def predict():
                 "content-type": "multipart/form-data",
                 "form-data": {
                     "image": "(file) - The food image to analyze"
+                },
+                "query": {
+                    "mode": "single (default) or plate - several dishes on one plate"
                 }
             }
         })
         
     if "image" not in request.files:
         return jsonify({"error": "No image uploaded"}), 400
-
-    image_file = request.files["image"]
-    image_path = os.path.join(DATA_DIR, image_file.filename)
-    image_file.save(image_path)
-
-    img_tensor = preprocess_image(image_path)
-    preds = model.predict(img_tensor)[0]
-    top_indices = preds.argsort()[-3:][::-1]
-
-    top_predictions = [
-        {"label": label_map[str(i)], "confidence": float(preds[i])}
-        for i in top_indices
-    ]
-
-    if top_predictions[0]["confidence"] < CONFIDENCE_THRESHOLD:
-        return jsonify({
-            "status": "uncertain",
-            "options": top_predictions
-        })
-
-    label = top_predictions[0]["label"]
-    nutrition = nutrition_data.get(label, {})
-    return jsonify({
-        "status": "confident",
-        "predicted_label": label,
-        "confidence": top_predictions[0]["confidence"],
-        "nutrition": nutrition
-    })
+    mode = request.args.get("mode", "single")
+    if mode not in ("single", "plate"):
+        return jsonify({"error": "mode must be 'single' or 'plate'"}), 400
+
+    if not _prediction_slots.acquire(timeout=PREDICT_QUEUE_TIMEOUT):
+        REJECTED.inc()
+        return jsonify({"error": "Server busy, please retry."}), 503, {"Retry-After": str(RETRY_AFTER_SECONDS)}
+    try:
+        return _predict(request.files["image"], mode)
+    finally:
+        _prediction_slots.release()
+
+
+def upload_name(client_filename):
+    """Server-side name for an upload; only the extension comes from the client."""
+    extension = os.path.splitext(client_filename or "")[1].lower()
+    if extension not in image_index.IMAGE_EXTENSIONS:
+        extension = ".jpg"
+    return uuid.uuid4().hex + extension
+
+
+def _predict(image_file, mode):
+    with STAGE_SECONDS.labels("upload").time():
+        os.makedirs(DATA_DIR, exist_ok=True)
+        image_name = upload_name(image_file.filename)
+        image_path = os.path.join(DATA_DIR, image_name)
+        payload = image_file.read()
+        # Complete files only: readers never see a half-written upload
+        with open(image_path + ".part", "wb") as f:
+            f.write(payload)
+        os.replace(image_path + ".part", image_path)
+
+    started = time.perf_counter()
+    try:
+        if mode == "plate":
+            result = plate.classify_plate(io.BytesIO(payload))
+        else:
+            result, raw = classify_with_raw(io.BytesIO(payload))
+            # Sampled copy to the candidate model; only a queue put on this path
+            shadow.submit(image_name, payload, raw, time.perf_counter() - started)
+    except inference.InvalidImage:
+        os.remove(image_path)
+        return jsonify({"error": "Could not read the uploaded image"}), 400
+    with STAGE_SECONDS.labels("serialization").time():
+        # image_name is what /feedback expects back
+        return jsonify(dict(result, image_name=image_name))
 
 
 @app.route("/feedback", methods=["POST", "GET"])
@@ -185,4 +223,6 @@ def feedback():
 
 
 if __name__ == "__main__":
+    # Development server only; use gunicorn.conf.py in production
+    inference.start_background_load()
     app.run(debug=True)
\ No newline at end of file
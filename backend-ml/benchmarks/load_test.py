@@ -0,0 +1,135 @@
+"""Load test for a running backend-ml /predict endpoint.
+
+Sends synthetic JPEGs from a fixed number of concurrent clients and reports
+latency percentiles and images/sec as JSON.
+
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --concurrency 8 --requests 400
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+import numpy as np
+from PIL import Image
+
+
+def make_images(count, size=(640, 480), seed=0):
+    """Encode `count` random-noise JPEGs; noise defeats any caching."""
+    rng = np.random.default_rng(seed)
+    images = []
+    for _ in range(count):
+        pixels = rng.integers(0, 256, size=(size[1], size[0], 3), dtype=np.uint8)
+        buf = io.BytesIO()
+        Image.fromarray(pixels).save(buf, format="JPEG", quality=85)
+        images.append(buf.getvalue())
+    return images
+
+
+def encode_multipart(field, filename, payload):
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        "Content-Type: image/jpeg\r\n\r\n"
+    ).encode() + payload + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run(url, concurrency, total_requests, images, timeout):
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    counter = iter(range(total_requests))
+
+    def worker():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            body, content_type = encode_multipart("image", f"load_test_{i % len(images)}.jpg", images[i % len(images)])
+            req = urllib.request.Request(url, data=body, headers={"Content-Type": content_type})
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(req, timeout=timeout) as resp:
+                    resp.read()
+                    status = resp.status
+            except urllib.error.HTTPError as e:
+                status = e.code
+            except Exception:
+                status = "error"
+            elapsed = time.perf_counter() - started
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+                if status == 200:
+                    latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "url": url,
+        "cpu_count": os.cpu_count(),
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "status_counts": {str(k): v for k, v in statuses.items()},
+        "wall_seconds": wall,
+        "images_per_second": len(latencies) / wall if wall else 0.0,
+        "latency_ms": {
+            "mean": statistics.fmean(latencies) * 1000 if latencies else None,
+            "p50": percentile(latencies, 50) * 1000 if latencies else None,
+            "p99": percentile(latencies, 99) * 1000 if latencies else None,
+            "max": latencies[-1] * 1000 if latencies else None,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--images", type=int, default=16, help="distinct synthetic images to cycle through")
+    parser.add_argument("--warmup", type=int, default=4, help="untimed requests sent first")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="write the JSON report here as well as stdout")
+    args = parser.parse_args()
+
+    predict_url = args.url.rstrip("/") + "/predict"
+    images = make_images(args.images)
+    if args.warmup:
+        run(predict_url, 1, args.warmup, images, args.timeout)
+
+    report = run(predict_url, args.concurrency, args.requests, images, args.timeout)
+    if "429" in report["status_counts"]:
+        print("Warning: the server rate-limited this run; start it with BHOJANBUDDY_RATE_LIMIT=0", file=sys.stderr)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
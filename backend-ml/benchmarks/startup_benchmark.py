@@ -0,0 +1,99 @@
+"""Measure backend-ml cold start: app import, model load and first prediction.
+
+Each run happens in a fresh interpreter so module caches don't skew results.
+
+    python benchmarks/startup_benchmark.py --runs 5
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# What serving reads from its model directory
+MODEL_FILES = ["food_model.h5", "label_map.json", "nutrition_db.json", "label_table.npy", "calibration.json"]
+
+# Runs inside the child interpreter and prints one JSON line of timings
+CHILD_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, {ml_dir!r})
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+client = app.app.test_client()
+alive = client.get("/healthz").status_code
+t2 = time.perf_counter()
+import inference
+inference.load()
+t3 = time.perf_counter()
+import io
+import numpy as np
+from PIL import Image
+buf = io.BytesIO()
+Image.fromarray(np.zeros((480, 640, 3), dtype=np.uint8)).save(buf, format="JPEG")
+buf.seek(0)
+client.post("/predict", data={{"image": (buf, "startup_benchmark.jpg")}}, content_type="multipart/form-data")
+t4 = time.perf_counter()
+print(json.dumps({{
+    "import_seconds": t1 - t0,
+    "healthz_status": alive,
+    "healthz_seconds": t2 - t1,
+    "load_seconds": t3 - t2,
+    "first_predict_seconds": t4 - t3,
+    "time_to_ready_seconds": t3 - t0,
+}}))
+"""
+
+METRICS = ["import_seconds", "healthz_seconds", "load_seconds", "first_predict_seconds", "time_to_ready_seconds"]
+
+
+def run_once(preload):
+    # A scratch copy of the model files and a scratch upload directory, so the
+    # probe upload and any placeholder model never land in backend-ml
+    with tempfile.TemporaryDirectory(prefix="bhojanbuddy-startup-") as workdir:
+        model_dir = os.path.join(workdir, "model")
+        os.makedirs(model_dir)
+        for name in MODEL_FILES:
+            if os.path.exists(os.path.join(ML_DIR, "model", name)):
+                shutil.copy2(os.path.join(ML_DIR, "model", name), model_dir)
+        env = dict(
+            os.environ,
+            BHOJANBUDDY_PRELOAD_MODEL="1" if preload else "0",
+            BHOJANBUDDY_ML_MODEL_DIR=model_dir,
+            BHOJANBUDDY_ML_DATA_DIR=os.path.join(workdir, "data"),
+            TF_CPP_MIN_LOG_LEVEL="3",
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD_SCRIPT.format(ml_dir=ML_DIR)],
+            cwd=ML_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--preload", action="store_true", help="set BHOJANBUDDY_PRELOAD_MODEL=1")
+    parser.add_argument("--output", help="write the JSON report here as well as stdout")
+    args = parser.parse_args()
+
+    runs = [run_once(args.preload) for _ in range(args.runs)]
+    report = {
+        "runs": args.runs,
+        "preload": args.preload,
+        "median": {m: statistics.median(r[m] for r in runs) for m in METRICS},
+        "raw": runs,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Confidence calibration for the confident/uncertain decision.
+
+Fitted by training/calibrate.py on the validation split plus /feedback
+corrections and saved as model/calibration.json:
+
+- `temperature`: softmax temperature that minimises the negative log
+  likelihood. Because the model outputs probabilities, serving rescales their
+  logs; softmax(log(p) / T) is the same as softmax(logits / T).
+- `thresholds`: per class id, the lowest calibrated confidence at which that
+  class's top-1 predictions reach the target precision. Classes with too few
+  samples use the global threshold fitted the same way.
+
+The file records the SHA-256 of the model it was fitted on and whether the
+thresholds were fitted on TTA-averaged probabilities (`tta`). Serving ignores
+it for any other model or TTA setting and falls back to CONFIDENCE_THRESHOLD.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# Search range for the temperature (log-spaced golden-section search)
+MIN_TEMPERATURE = 0.05
+MAX_TEMPERATURE = 20.0
+
+
+def model_fingerprint(model_path):
+    digest = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def apply_temperature(probs, temperature):
+    """Rescale softmax rows (one row or an (N, C) batch) by a temperature."""
+    if temperature == 1.0:
+        return probs
+    logits = np.log(np.maximum(probs, 1e-12)) / temperature
+    logits -= logits.max(axis=-1, keepdims=True)
+    scaled = np.exp(logits)
+    return scaled / scaled.sum(axis=-1, keepdims=True)
+
+
+def nll(probs, labels, temperature):
+    """Mean negative log likelihood of the true labels after scaling."""
+    scaled = apply_temperature(probs, temperature)
+    return float(-np.log(np.maximum(scaled[np.arange(len(labels)), labels], 1e-12)).mean())
+
+
+def fit_temperature(probs, labels, iterations=40):
+    """Temperature minimising NLL; the NLL is unimodal in log(T)."""
+    ratio = (np.sqrt(5) - 1) / 2
+    low, high = np.log(MIN_TEMPERATURE), np.log(MAX_TEMPERATURE)
+    a, b = high - ratio * (high - low), low + ratio * (high - low)
+    fa, fb = nll(probs, labels, np.exp(a)), nll(probs, labels, np.exp(b))
+    for _ in range(iterations):
+        if fa < fb:
+            high, b, fb = b, a, fa
+            a = high - ratio * (high - low)
+            fa = nll(probs, labels, np.exp(a))
+        else:
+            low, a, fa = a, b, fb
+            b = low + ratio * (high - low)
+            fb = nll(probs, labels, np.exp(b))
+    return float(np.exp((low + high) / 2))
+
+
+def precision_threshold(confidence, correct, target):
+    """Lowest confidence t such that predictions with confidence >= t reach `target` precision.
+
+    Returns None when no threshold does.
+    """
+    order = np.argsort(-confidence, kind="stable")
+    confidence, correct = confidence[order], correct[order]
+    precision = np.cumsum(correct) / np.arange(1, len(correct) + 1)
+    # A cut is only valid between distinct confidences
+    cuts = np.append(confidence[1:] < confidence[:-1], True)
+    valid = np.flatnonzero((precision >= target) & cuts)
+    if len(valid) == 0:
+        return None
+    return float(confidence[valid[-1]])
+
+
+def fit_thresholds(probs, labels, target_precision, min_samples, default):
+    """Per-class thresholds on calibrated probabilities; returns (thresholds, global)."""
+    predicted = probs.argmax(axis=1)
+    confidence = probs.max(axis=1)
+    correct = predicted == labels
+
+    fitted = precision_threshold(confidence, correct, target_precision)
+    global_threshold = default if fitted is None else fitted
+    thresholds = np.full(probs.shape[1], global_threshold)
+    counts = np.bincount(predicted, minlength=probs.shape[1])
+    for class_id in np.flatnonzero(counts >= min_samples):
+        mask = predicted == class_id
+        fitted = precision_threshold(confidence[mask], correct[mask], target_precision)
+        # No threshold reaches the target: only certain predictions pass
+        thresholds[class_id] = 1.0 if fitted is None else fitted
+    return thresholds, global_threshold
+
+
+def save(calibration, path):
+    # Write then rename, so serving never reads a half-written file
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(calibration, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load(path, model_path, num_classes, tta):
+    """(temperature, thresholds array) for this model and TTA setting, or None when the file doesn't apply."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        calibration = json.load(f)
+    if calibration.get("model_sha256") != model_fingerprint(model_path):
+        print("Warning: calibration.json was fitted on another model; ignoring it.")
+        return None
+    # Files without the key predate TTA-aware fitting: single-pass thresholds
+    if calibration.get("tta", False) != tta:
+        print(f"Warning: calibration.json was fitted with TTA {'on' if calibration.get('tta') else 'off'} "
+              f"but serving has it {'on' if tta else 'off'}; ignoring it.")
+        return None
+    thresholds = np.asarray(calibration["thresholds"], dtype=np.float64)
+    if len(thresholds) != num_classes:
+        print("Warning: calibration.json class count doesn't match the label table; ignoring it.")
+        return None
+    return float(calibration["temperature"]), thresholds
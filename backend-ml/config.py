@@ -1,3 +1,71 @@
+import os
+
+ML_DIR = os.path.dirname(os.path.abspath(__file__))
+# Model files and the images /predict saves; benchmarks point these at a scratch copy
+MODEL_DIR = os.getenv("BHOJANBUDDY_ML_MODEL_DIR") or os.path.join(ML_DIR, "model")
+DATA_DIR = os.getenv("BHOJANBUDDY_ML_DATA_DIR") or os.path.join(ML_DIR, "data")
+
 IMAGE_SIZE = (224, 224)  # Standard size for EfficientNet
 BATCH_SIZE = 32  
-EPOCHS = 18  # More epochs with early stopping
\ No newline at end of file
+EPOCHS = 18  # More epochs with early stopping
+
+# Top-1 softmax confidence below which /predict returns options instead of a label
+CONFIDENCE_THRESHOLD = 0.7
+# Re-check uncertain images with flipped/cropped views in one batched pass
+TTA_ENABLED = os.getenv("BHOJANBUDDY_ML_TTA", "1") == "1"
+TTA_CROP_SCALE = 0.8  # fraction of the shorter side kept by the centre crop
+
+# Plate mode (/predict?mode=plate): classify overlapping grid windows in one batch
+PLATE_GRID = 3  # windows per side
+PLATE_WINDOW_SCALE = 0.5  # window size as a fraction of each image side
+PLATE_MAX_CROPS = 9
+# Lower than CONFIDENCE_THRESHOLD: a crop only has to name the dish it covers
+PLATE_CONFIDENCE_THRESHOLD = 0.5
+# Windows whose pixel std-dev is below this (on a 0-1 scale) are empty plate/table
+PLATE_MIN_SALIENCY = 0.04
+# Fewer crops are classified when the measured per-crop cost would exceed this
+PLATE_BUDGET_SECONDS = float(os.getenv("BHOJANBUDDY_ML_PLATE_BUDGET", "1.0"))
+
+# Shadow evaluation: mirror a sample of /predict to a candidate model off the response path
+SHADOW_MODEL_PATH = os.getenv("BHOJANBUDDY_ML_SHADOW_MODEL") or None
+# Candidate's own label map if its classes differ from the primary model's
+SHADOW_LABEL_MAP_PATH = os.getenv("BHOJANBUDDY_ML_SHADOW_LABEL_MAP") or None
+SHADOW_SAMPLE_RATE = float(os.getenv("BHOJANBUDDY_ML_SHADOW_SAMPLE", "0.1"))
+SHADOW_BATCH_SIZE = 8
+SHADOW_MAX_WAIT = 0.5  # seconds to fill a candidate batch
+SHADOW_QUEUE_SIZE = 256  # mirrored requests beyond this are dropped
+SHADOW_LOG_PATH = os.getenv("BHOJANBUDDY_ML_SHADOW_LOG", os.path.join(MODEL_DIR, "shadow_log.jsonl"))
+
+# Duplicate image index (image_index.py): uploads, feedback images and the dataset
+IMAGE_INDEX_PATH = os.getenv("BHOJANBUDDY_ML_IMAGE_INDEX", os.path.join(MODEL_DIR, "image_index.json"))
+# Images whose 64-bit difference hashes differ in at most this many bits are near duplicates
+NEAR_DUPLICATE_DISTANCE = 6
+
+# Serving
+# Load label map / nutrition DB in the pre-fork master (gunicorn preload_app)
+PRELOAD_MODEL = os.getenv("BHOJANBUDDY_PRELOAD_MODEL", "0") == "1"
+
+CPU_COUNT = os.cpu_count() or 1
+# Gunicorn worker processes and request threads per worker
+WORKERS = int(os.getenv("BHOJANBUDDY_ML_WORKERS", max(1, CPU_COUNT // 2)))
+THREADS = int(os.getenv("BHOJANBUDDY_ML_THREADS", "4"))
+# TensorFlow thread pools per worker, split so all workers together use each core once
+INTRA_OP_THREADS = int(os.getenv("BHOJANBUDDY_ML_INTRA_OP_THREADS", max(1, CPU_COUNT // WORKERS)))
+INTER_OP_THREADS = int(os.getenv("BHOJANBUDDY_ML_INTER_OP_THREADS", "1"))
+# In-flight predictions per worker; beyond this /predict answers 503 + Retry-After
+MAX_CONCURRENT_PREDICTIONS = int(os.getenv("BHOJANBUDDY_ML_MAX_CONCURRENT", "2"))
+PREDICT_QUEUE_TIMEOUT = float(os.getenv("BHOJANBUDDY_ML_QUEUE_TIMEOUT", "0.25"))  # seconds
+RETRY_AFTER_SECONDS = 1
+
+# Token-bucket rate limits per client IP and route class,
+# as "<requests>/<second|minute|hour|day>" or "off"
+RATE_LIMIT_ENABLED = os.getenv("BHOJANBUDDY_RATE_LIMIT", "1") == "1"
+RATE_LIMITS = {
+    "inference": os.getenv("BHOJANBUDDY_RATE_LIMIT_INFERENCE", "30/minute"),
+    "writes": os.getenv("BHOJANBUDDY_RATE_LIMIT_WRITES", "120/minute"),
+    "reads": os.getenv("BHOJANBUDDY_RATE_LIMIT_READS", "600/minute"),
+}
+# Set to a SQLite file to share buckets between gunicorn workers
+RATE_LIMIT_STORE = os.getenv("BHOJANBUDDY_RATE_LIMIT_STORE") or None
+# Key clients by the first X-Forwarded-For address (only behind a trusted proxy)
+TRUST_FORWARDED_FOR = os.getenv("BHOJANBUDDY_TRUST_FORWARDED_FOR", "0") == "1"
@@ -0,0 +1,47 @@
+# Gunicorn settings for the production backend-ml server
+#
+#   cd backend-ml && gunicorn -c gunicorn.conf.py app:app
+#
+# Every setting can be overridden with the BHOJANBUDDY_ML_* environment
+# variables read in config.py.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import INTER_OP_THREADS, INTRA_OP_THREADS, PRELOAD_MODEL, THREADS, WORKERS
+
+bind = os.getenv("BHOJANBUDDY_ML_BIND", "0.0.0.0:8000")
+
+# Separate processes so inference runs in parallel without sharing the GIL;
+# a few threads per worker overlap upload I/O with inference
+workers = WORKERS
+worker_class = "gthread"
+threads = THREADS
+
+# Import the app (and preload shareable data) once in the master before forking
+preload_app = PRELOAD_MODEL
+
+# Model loading can take a while on cold start; /healthz answers meanwhile
+timeout = 120
+graceful_timeout = 30
+
+
+def when_ready(server):
+    server.log.info(
+        f"backend-ml: {WORKERS} workers x {THREADS} threads, "
+        f"TensorFlow intra_op={INTRA_OP_THREADS} inter_op={INTER_OP_THREADS}"
+    )
+
+
+def child_exit(server, worker):
+    # Drop a dead worker's live gauges when metrics are aggregated across workers
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def post_worker_init(worker):
+    # Load the model in the background so /readyz flips without a first request
+    import inference
+    inference.start_background_load()
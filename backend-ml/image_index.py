@@ -0,0 +1,312 @@
+"""Exact and near-duplicate image index.
+
+Every image under the indexed directories gets a SHA-256 of its bytes (exact
+duplicates) and a 64-bit difference hash (near duplicates: re-encodes,
+resizes, small crops and colour changes). The index is a JSON file keyed by
+path. An update only re-hashes files whose size or mtime changed, and drops
+files that are gone. Near-duplicate search uses multi-index hashing, so each
+lookup checks a handful of candidates instead of comparing against every
+image.
+
+    python image_index.py update                 # (re)index the default directories
+    python image_index.py duplicates --json      # exact and near-duplicate groups
+    python image_index.py gc --apply             # hard-link byte-identical copies
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
+
+import numpy as np
+from PIL import Image
+
+from config import DATA_DIR, IMAGE_INDEX_PATH, NEAR_DUPLICATE_DISTANCE
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DIRS = [
+    os.path.join(ROOT_DIR, "backend", "uploads", "food_images"),
+    DATA_DIR,
+    os.path.join(ROOT_DIR, "backend-ml", "training", "dataset"),
+]
+# gc never links files here: these are live uploads, and a tool that edits one
+# in place would rewrite every linked copy
+NO_LINK_DIRS = [DATA_DIR]
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp')
+HASH_SIZE = 8  # 8x8 gradient bits -> 64-bit hash
+INDEX_VERSION = 1
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+def dhash(img, size=HASH_SIZE):
+    """Difference hash: is each pixel brighter than its right neighbour, on a (size+1)xsize thumbnail."""
+    # JPEG decoders can downscale while decoding; far cheaper than a full decode
+    img.draft("L", ((size + 1) * 8, size * 8))
+    pixels = np.asarray(img.convert("L").resize((size + 1, size), Image.Resampling.BILINEAR), dtype=np.int16)
+    bits = np.packbits(pixels[:, 1:] > pixels[:, :-1])
+    return int.from_bytes(bits.tobytes(), "big")
+
+
+def hash_file(path):
+    """(sha256 hex, dhash) of one image file; dhash is None if it can't be decoded."""
+    with open(path, "rb") as f:
+        payload = f.read()
+    try:
+        perceptual = dhash(Image.open(io.BytesIO(payload)))
+    except Exception:
+        perceptual = None
+    return hashlib.sha256(payload).hexdigest(), perceptual
+
+
+class MultiIndex:
+    """Hamming-radius search by multi-index hashing.
+
+    Hashes are split into `chunks` substrings, each with its own table. Two
+    hashes within `radius` bits have at least one substring within
+    radius // chunks bits of each other (pigeonhole), so a query only probes
+    those few table keys and verifies the candidates it finds there, instead
+    of comparing against every stored hash.
+    """
+
+    def __init__(self, radius, bits=HASH_SIZE * HASH_SIZE, chunks=4):
+        self.radius = radius
+        self.width = bits // chunks
+        self.mask = (1 << self.width) - 1
+        per_chunk = radius // chunks
+        # Every way to flip up to per_chunk bits of one substring
+        self.flips = [0] + [
+            sum(1 << bit for bit in combo)
+            for count in range(1, per_chunk + 1)
+            for combo in combinations(range(self.width), count)
+        ]
+        self.tables = [{} for _ in range(chunks)]
+        self.values = []
+
+    def _substrings(self, value):
+        return [(value >> (k * self.width)) & self.mask for k in range(len(self.tables))]
+
+    def add(self, value, item):
+        self.values.append((value, item))
+        position = len(self.values) - 1
+        for table, key in zip(self.tables, self._substrings(value)):
+            table.setdefault(key, []).append(position)
+
+    def search(self, value):
+        """[(distance, item)] for every stored item within `radius` of `value`."""
+        candidates = set()
+        for table, key in zip(self.tables, self._substrings(value)):
+            for flip in self.flips:
+                positions = table.get(key ^ flip)
+                if positions:
+                    candidates.update(positions)
+        found = []
+        for position in candidates:
+            stored, item = self.values[position]
+            distance = hamming(value, stored)
+            if distance <= self.radius:
+                found.append((distance, item))
+        return found
+
+
+def index_key(path):
+    # Paths inside the repository are stored relative to it, so the index can move with it
+    path = os.path.abspath(path)
+    relative = os.path.relpath(path, ROOT_DIR)
+    return path if relative.startswith("..") else relative
+
+
+def resolve(key):
+    return key if os.path.isabs(key) else os.path.join(ROOT_DIR, key)
+
+
+def load(path=IMAGE_INDEX_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        data = json.load(f)
+    if data.get("version") != INDEX_VERSION or data.get("hash_size") != HASH_SIZE:
+        return {}
+    return data["entries"]
+
+
+def save(entries, path=IMAGE_INDEX_PATH):
+    # Write then rename, so a crash never leaves half an index
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"version": INDEX_VERSION, "hash_size": HASH_SIZE, "entries": entries}, f)
+    os.replace(tmp_path, path)
+
+
+def list_images(directories):
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield os.path.join(root, name)
+
+
+def update(entries, directories, workers=None):
+    """Bring `entries` up to date for `directories`; returns (added or changed, removed).
+
+    Entries outside `directories` are left alone, so one index can cover
+    several trees that are updated separately.
+    """
+    scanned = {}
+    for path in list_images(directories):
+        stat = os.stat(path)
+        scanned[index_key(path)] = (stat.st_size, stat.st_mtime_ns)
+
+    prefixes = [index_key(d).rstrip(os.sep) + os.sep for d in directories]
+    removed = [key for key in entries if key.startswith(tuple(prefixes)) and key not in scanned]
+    for key in removed:
+        del entries[key]
+
+    changed = [
+        key for key, (size, mtime_ns) in scanned.items()
+        if key not in entries or (entries[key]["size"], entries[key]["mtime_ns"]) != (size, mtime_ns)
+    ]
+    # Decoding releases the GIL, so threads hash in parallel
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        for key, (sha256, perceptual) in zip(changed, pool.map(lambda k: hash_file(resolve(k)), changed)):
+            size, mtime_ns = scanned[key]
+            entries[key] = {
+                "size": size,
+                "mtime_ns": mtime_ns,
+                "sha256": sha256,
+                "dhash": None if perceptual is None else f"{perceptual:016x}",
+            }
+    return len(changed), len(removed)
+
+
+def exact_groups(entries, keys=None):
+    """Lists of keys with byte-identical content, largest files first."""
+    by_sha = {}
+    for key in sorted(keys if keys is not None else entries):
+        by_sha.setdefault(entries[key]["sha256"], []).append(key)
+    groups = [group for group in by_sha.values() if len(group) > 1]
+    return sorted(groups, key=lambda group: -entries[group[0]]["size"])
+
+
+def clusters(entries, keys=None, radius=NEAR_DUPLICATE_DISTANCE):
+    """Connected components of images within `radius` bits of each other.
+
+    Every image belongs to exactly one cluster (singletons included).
+    """
+    keys = sorted(keys if keys is not None else entries)
+    parent = list(range(len(keys)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # Byte-identical files are joined directly; only one of them is searched
+    index = MultiIndex(radius)
+    first_by_sha = {}
+    for i, key in enumerate(keys):
+        entry = entries[key]
+        first = first_by_sha.setdefault(entry["sha256"], i)
+        if first != i:
+            parent[find(i)] = find(first)
+        elif entry["dhash"] is not None:
+            value = int(entry["dhash"], 16)
+            for _, j in index.search(value):
+                parent[find(i)] = find(j)
+            index.add(value, i)
+
+    groups = {}
+    for i, key in enumerate(keys):
+        groups.setdefault(find(i), []).append(key)
+    return list(groups.values())
+
+
+def near_groups(entries, keys=None, radius=NEAR_DUPLICATE_DISTANCE):
+    """Clusters that contain more than one distinct file content."""
+    return [
+        group for group in clusters(entries, keys, radius)
+        if len({entries[key]["sha256"] for key in group}) > 1
+    ]
+
+
+def _unchanged(entry, stat):
+    return (stat.st_size, stat.st_mtime_ns) == (entry["size"], entry["mtime_ns"])
+
+
+def reclaim(entries, keys=None, apply=False, exclude=NO_LINK_DIRS):
+    """Replace byte-identical copies with hard links to one file.
+
+    Every path keeps resolving, so database rows, feedback entries and the
+    dataset layout are untouched; only the duplicate bytes are freed. Files
+    under `exclude` are neither linked nor linked to. Returns (files linked,
+    bytes reclaimed); with apply=False nothing is changed.
+    """
+    prefixes = tuple(index_key(d).rstrip(os.sep) + os.sep for d in exclude)
+    keys = [key for key in (keys if keys is not None else entries) if not key.startswith(prefixes)]
+    linked = reclaimed = 0
+    for group in exact_groups(entries, keys):
+        canonical = resolve(group[0])
+        canonical_stat = os.stat(canonical)
+        if not _unchanged(entries[group[0]], canonical_stat):
+            continue  # rewritten since it was hashed
+        for key in group[1:]:
+            path = resolve(key)
+            stat = os.stat(path)
+            if not _unchanged(entries[key], stat):
+                continue
+            if (stat.st_dev, stat.st_ino) == (canonical_stat.st_dev, canonical_stat.st_ino):
+                continue  # already one file
+            if stat.st_dev != canonical_stat.st_dev:
+                continue  # hard links can't cross filesystems
+            if apply:
+                tmp_path = path + ".dedup"
+                os.link(canonical, tmp_path)
+                os.replace(tmp_path, path)
+                entries[key]["mtime_ns"] = canonical_stat.st_mtime_ns
+            linked += 1
+            reclaimed += stat.st_size
+    return linked, reclaimed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exact and near-duplicate image index")
+    parser.add_argument("command", choices=["update", "duplicates", "gc"])
+    parser.add_argument("--dirs", nargs="+", default=DEFAULT_DIRS)
+    parser.add_argument("--index", default=IMAGE_INDEX_PATH)
+    parser.add_argument("--radius", type=int, default=NEAR_DUPLICATE_DISTANCE,
+                        help="max differing dhash bits (of 64) for near duplicates")
+    parser.add_argument("--json", action="store_true", help="print groups as JSON")
+    parser.add_argument("--apply", action="store_true", help="gc: link files instead of a dry run")
+    args = parser.parse_args()
+
+    entries = load(args.index)
+    changed, removed = update(entries, args.dirs)
+    save(entries, args.index)
+    keys = [key for key in entries if os.path.exists(resolve(key))]
+    print(f"Indexed {len(keys)} images ({changed} hashed, {removed} removed) in {args.index}")
+
+    if args.command == "duplicates":
+        exact = exact_groups(entries, keys)
+        near = near_groups(entries, keys, args.radius)
+        if args.json:
+            print(json.dumps({"exact": exact, "near": near}, indent=2))
+        else:
+            for label, groups in (("Exact", exact), ("Near", near)):
+                print(f"\n{label} duplicate groups: {len(groups)}")
+                for group in groups:
+                    print("  " + "\n    ".join(group))
+    elif args.command == "gc":
+        linked, reclaimed = reclaim(entries, keys, apply=args.apply)
+        save(entries, args.index)
+        action = "Linked" if args.apply else "Would link"
+        print(f"{action} {linked} duplicate files, reclaiming {reclaimed / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+import json
+import os
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+from config import (
+    CONFIDENCE_THRESHOLD,
+    IMAGE_SIZE,
+    INTER_OP_THREADS,
+    INTRA_OP_THREADS,
+    MODEL_DIR,
+    TTA_CROP_SCALE,
+    TTA_ENABLED,
+)
+import calibration
+import label_table
+from metrics import PREDICTIONS, STAGE_SECONDS
+
+# MODEL_DIR comes from config (BHOJANBUDDY_ML_MODEL_DIR)
+MODEL_PATH = os.path.join(MODEL_DIR, "food_model.h5")
+LABEL_MAP_PATH = os.path.join(MODEL_DIR, "label_map.json")
+NUTRITION_DB_PATH = os.path.join(MODEL_DIR, "nutrition_db.json")
+# Built from the two JSON files by training/build_label_table.py
+LABEL_TABLE_PATH = os.path.join(MODEL_DIR, "label_table.npy")
+# Fitted for one model file by training/calibrate.py
+CALIBRATION_PATH = os.path.join(MODEL_DIR, "calibration.json")
+
+TOP_K = 3
+
+# Everything below is filled in by load(); nothing heavy happens at import time
+_lock = threading.Lock()
+_state = {
+    "model": None,
+    # Structured array indexed by class id (see label_table.py)
+    "table": None,
+    "nutrients": None,
+    # Softmax temperature and per-class thresholds from calibration.json;
+    # thresholds stay None (global CONFIDENCE_THRESHOLD) without one
+    "temperature": 1.0,
+    "thresholds": None,
+    "loading": False,
+    "error": None,
+    "load_seconds": None,
+}
+
+
+def ensure_placeholders(include_model=True):
+    """Create placeholder model files for development if they don't exist."""
+    os.makedirs(MODEL_DIR, exist_ok=True)
+
+    if include_model and not os.path.exists(MODEL_PATH):
+        print("Warning: Model file not found. Please train the model first.")
+        import tensorflow as tf
+
+        # Create a simple placeholder model for development
+        simple_model = tf.keras.Sequential([
+            tf.keras.layers.Input(shape=(*IMAGE_SIZE, 3)),
+            tf.keras.layers.GlobalAveragePooling2D(),
+            tf.keras.layers.Dense(10, activation='softmax')
+        ])
+        simple_model.compile(optimizer='adam', loss='categorical_crossentropy')
+        simple_model.save(MODEL_PATH)
+
+    if not os.path.exists(LABEL_MAP_PATH):
+        print("Warning: Label map not found. Creating placeholder.")
+        with open(LABEL_MAP_PATH, "w") as f:
+            json.dump({"0": "placeholder_food"}, f)
+
+    if not os.path.exists(NUTRITION_DB_PATH):
+        print("Warning: Nutrition database not found. Creating placeholder.")
+        with open(NUTRITION_DB_PATH, "w") as f:
+            json.dump({"placeholder_food": {"calories": 100}}, f)
+
+
+def _load_tables():
+    if label_table.is_stale(LABEL_TABLE_PATH, LABEL_MAP_PATH, NUTRITION_DB_PATH):
+        # Same table, built in process memory; rebuild the .npy to share it
+        print("Warning: label_table.npy missing or stale; building it from JSON.")
+        table = label_table.build_from_files(LABEL_MAP_PATH, NUTRITION_DB_PATH)
+    else:
+        # mmap: workers share the page cache instead of each holding a copy
+        table = label_table.load(LABEL_TABLE_PATH)
+    _state["nutrients"] = label_table.nutrient_names(table)
+    _state["table"] = table
+
+
+def preload():
+    """Load everything that is safe to share with forked workers.
+
+    The TensorFlow runtime is not fork-safe (its thread pools do not survive
+    fork), so a pre-fork master only loads the label map and nutrition DB and
+    reads the model file once so every worker loads it from the page cache.
+    """
+    with _lock:
+        ensure_placeholders(include_model=False)
+        if _state["table"] is None:
+            _load_tables()
+    if os.path.exists(MODEL_PATH):
+        with open(MODEL_PATH, "rb") as f:
+            while f.read(1 << 20):
+                pass
+
+
+def _configure_tensorflow(tf):
+    # Must run before the first op creates TensorFlow's thread pools
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(INTRA_OP_THREADS)
+        tf.config.threading.set_inter_op_parallelism_threads(INTER_OP_THREADS)
+    except RuntimeError as e:
+        print(f"Warning: TensorFlow threads already configured: {e}")
+
+
+def load():
+    """Load the model, label map and nutrition DB exactly once per process."""
+    if _state["model"] is not None:
+        return _state
+
+    with _lock:
+        if _state["model"] is not None:
+            return _state
+
+        _state["loading"] = True
+        started = time.perf_counter()
+        try:
+            import tensorflow as tf
+
+            _configure_tensorflow(tf)
+            ensure_placeholders()
+            if _state["table"] is None:
+                _load_tables()
+
+            model = tf.keras.models.load_model(MODEL_PATH, compile=False)
+            # Warm up so the first real request doesn't pay for graph tracing
+            model(np.zeros((1, *IMAGE_SIZE, 3), dtype=np.float32), training=False)
+            fitted = calibration.load(CALIBRATION_PATH, MODEL_PATH, len(_state["table"]), TTA_ENABLED)
+        except Exception as e:
+            _state["error"] = str(e)
+            raise
+        finally:
+            _state["loading"] = False
+
+        _state["error"] = None
+        if fitted is not None:
+            _state["temperature"], _state["thresholds"] = fitted
+        _state["load_seconds"] = time.perf_counter() - started
+        # Set last so readiness only flips once everything is usable
+        _state["model"] = model
+        return _state
+
+
+def start_background_load():
+    """Kick off load() in a daemon thread; returns immediately."""
+    if _state["model"] is not None or _state["loading"]:
+        return
+
+    def _run():
+        try:
+            load()
+        except Exception as e:
+            print(f"Error loading model: {e}")
+
+    threading.Thread(target=_run, name="model-loader", daemon=True).start()
+
+
+def is_ready():
+    return _state["model"] is not None
+
+
+def status():
+    """Readiness details for the /readyz endpoint."""
+    return {
+        "ready": is_ready(),
+        "loading": _state["loading"],
+        "error": _state["error"],
+        "load_seconds": _state["load_seconds"],
+        "calibrated": _state["thresholds"] is not None,
+    }
+
+
+def predict_batch(batch):
+    """Run the model on a preprocessed (N, H, W, 3) batch and return softmax rows.
+
+    Calling the model directly is thread-safe for inference and avoids the
+    per-call setup cost of model.predict() on small batches.
+    """
+    model = load()["model"]
+    return np.asarray(model(batch, training=False))
+
+
+def calibrated(preds):
+    """Temperature-scaled softmax rows; unchanged without a calibration file."""
+    return calibration.apply_temperature(preds, _state["temperature"])
+
+
+def confidence_threshold(class_id):
+    thresholds = _state["thresholds"]
+    return CONFIDENCE_THRESHOLD if thresholds is None else thresholds[class_id]
+
+
+class InvalidImage(ValueError):
+    """The input couldn't be decoded as an image."""
+
+
+def decode_image(image):
+    """Open an image (path or file object) as RGB with RGBA handling.
+
+    Raises InvalidImage for unreadable, truncated or oversized images.
+    """
+    try:
+        img = Image.open(image)
+
+        # Convert palette or images with transparency to RGBA, then to RGB
+        if img.mode in ("P", "LA") or (img.mode == "RGBA" and "transparency" in img.info):
+            img = img.convert("RGBA").convert("RGB")
+        else:
+            img = img.convert("RGB")
+    except (OSError, Image.DecompressionBombError) as e:
+        # UnidentifiedImageError and truncated-file errors are OSErrors
+        raise InvalidImage(str(e)) from e
+    return img
+
+
+def _to_array(img, box=None):
+    # `box` crops during the resize, straight from the decoded buffer
+    return np.asarray(img.resize(IMAGE_SIZE, box=box), dtype=np.float32) / 255.0
+
+
+def preprocess_image(image_path):
+    """Load and preprocess image (path or file object) for prediction."""
+    return np.expand_dims(_to_array(decode_image(image_path)), axis=0)
+
+
+def augmented_views(img, base):
+    """Flipped and centre-cropped views of a decoded image as one batch.
+
+    `base` is the already resized array of `img`, so only the crop needs
+    another resize.
+    """
+    width, height = img.size
+    side = int(min(width, height) * TTA_CROP_SCALE)
+    left, top = (width - side) // 2, (height - side) // 2
+    crop = _to_array(img.crop((left, top, left + side, top + side)))
+    return np.stack([
+        base[:, ::-1],   # horizontal flip
+        base[::-1, :],   # vertical flip
+        crop,
+        crop[:, ::-1],
+    ])
+
+
+def top_k(preds, k=TOP_K):
+    """Indices of the k largest scores, best first; O(n) instead of a full sort."""
+    k = min(k, len(preds))
+    top = np.argpartition(preds, -k)[-k:]
+    return top[np.argsort(preds[top])[::-1]]
+
+
+def top_options(table, preds, indices=None):
+    """[{"label", "confidence"}] for the top-k classes of one softmax row."""
+    if indices is None:
+        indices = top_k(preds)
+    return [
+        {"label": str(table[i][label_table.LABEL_FIELD]), "confidence": float(preds[i])}
+        for i in indices
+    ]
+
+
+def classify(image):
+    """Classify one image (path or file object) into the /predict response."""
+    return classify_with_raw(image)[0]
+
+
+def classify_with_raw(image):
+    """classify() plus the uncalibrated single-pass softmax row it started from."""
+    state = load()
+    table = state["table"]
+
+    with STAGE_SECONDS.labels("decode").time():
+        img = decode_image(image)
+        img.load()
+    with STAGE_SECONDS.labels("resize").time():
+        base = _to_array(img)
+    with STAGE_SECONDS.labels("inference").time():
+        raw = predict_batch(base[np.newaxis])[0]
+        preds = calibrated(raw[np.newaxis])[0]
+
+    # Second stage only for uncertain images: average softmax over a few views
+    tta = False
+    best = int(preds.argmax())
+    if TTA_ENABLED and preds[best] < confidence_threshold(best):
+        with STAGE_SECONDS.labels("tta").time():
+            views = augmented_views(img, base)
+            preds = (preds + calibrated(predict_batch(views)).sum(axis=0)) / (len(views) + 1)
+        tta = True
+
+    top_indices = top_k(preds)
+    top_predictions = top_options(table, preds, top_indices)
+
+    if top_predictions[0]["confidence"] < confidence_threshold(top_indices[0]):
+        result = {
+            "status": "uncertain",
+            "options": top_predictions
+        }
+    else:
+        label = top_predictions[0]["label"]
+        nutrition = label_table.nutrition_for(table, top_indices[0], state["nutrients"])
+        result = {
+            "status": "confident",
+            "predicted_label": label,
+            "confidence": top_predictions[0]["confidence"],
+            "nutrition": nutrition
+        }
+
+    if tta:
+        result["tta"] = True
+    PREDICTIONS.labels(result["status"]).inc()
+    return result, raw
+
@@ -0,0 +1,85 @@
+"""Compiled label and nutrition table.
+
+One NumPy structured array row per class id: the label plus one float column
+per nutrient (NaN when the nutrition DB has no value). Saved with np.save, so
+serving can memory-map it: every worker shares the same page-cache pages, and
+a lookup is a row index instead of a dict of dicts per process.
+"""
+import json
+import os
+
+import numpy as np
+
+LABEL_FIELD = "label"
+
+
+def build(label_map, nutrition_db):
+    """Structured array indexed by class id from the JSON label map and nutrition DB."""
+    count = max((int(i) for i in label_map), default=-1) + 1
+    labels = [label_map.get(str(i), f"class_{i}") for i in range(count)]
+
+    # Nutrient columns in first-seen order across the DB
+    nutrients = []
+    for values in nutrition_db.values():
+        for name in values:
+            if name not in nutrients:
+                nutrients.append(name)
+
+    width = max((len(label) for label in labels), default=1)
+    dtype = [(LABEL_FIELD, f"U{width}")] + [(name, np.float64) for name in nutrients]
+    table = np.zeros(count, dtype=dtype)
+    table[LABEL_FIELD] = labels
+    for name in nutrients:
+        table[name] = [nutrition_db.get(label, {}).get(name, np.nan) for label in labels]
+    return table
+
+
+def build_from_files(label_map_path, nutrition_db_path):
+    with open(label_map_path, "r") as f:
+        label_map = json.load(f)
+    with open(nutrition_db_path, "r") as f:
+        nutrition_db = json.load(f)
+    return build(label_map, nutrition_db)
+
+
+def save(table, path):
+    # Write then rename, so serving never maps a half-written file
+    tmp_path = path + ".tmp.npy"
+    np.save(tmp_path, table, allow_pickle=False)
+    os.replace(tmp_path, path)
+
+
+def load(path):
+    """Memory-map a saved table read-only."""
+    return np.load(path, mmap_mode="r", allow_pickle=False)
+
+
+def is_stale(path, *sources):
+    """True when the table is missing or older than any of its source files."""
+    if not os.path.exists(path):
+        return True
+    built = os.path.getmtime(path)
+    return any(os.path.exists(s) and os.path.getmtime(s) > built for s in sources)
+
+
+def nutrient_names(table):
+    return [name for name in table.dtype.names if name != LABEL_FIELD]
+
+
+def has_nutrition(table):
+    """Boolean mask of classes with at least one nutrient value."""
+    names = nutrient_names(table)
+    if not names:
+        return np.zeros(len(table), dtype=bool)
+    return ~np.isnan(np.column_stack([table[name] for name in names])).all(axis=1)
+
+
+def nutrition_for(table, class_id, names=None):
+    """Nutrition dict of one class, skipping missing values like the JSON DB did."""
+    row = table[class_id]
+    result = {}
+    for name in names or nutrient_names(table):
+        value = float(row[name])
+        if value == value:  # not NaN
+            result[name] = int(value) if value.is_integer() else value
+    return result
@@ -0,0 +1,60 @@
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Sub-second stages dominate; keep a few coarse buckets for slow cold starts
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+STAGE_SECONDS = Histogram(
+    "bhojanbuddy_ml_stage_seconds",
+    "Time spent in each /predict stage",
+    ["stage"],  # upload, decode, resize, plate_crops, inference, tta, serialization
+    buckets=STAGE_BUCKETS,
+)
+REQUEST_SECONDS = Histogram(
+    "bhojanbuddy_ml_request_seconds",
+    "End-to-end request latency",
+    ["endpoint", "method", "status"],
+    buckets=STAGE_BUCKETS,
+)
+PREDICTIONS = Counter(
+    "bhojanbuddy_ml_predictions_total",
+    "Predictions by outcome",
+    ["status"],  # confident, uncertain, plate
+)
+REJECTED = Counter(
+    "bhojanbuddy_ml_rejected_total",
+    "Requests shed with 503 because all prediction slots were busy",
+)
+SHADOW_PREDICTIONS = Counter(
+    "bhojanbuddy_ml_shadow_predictions_total",
+    "Mirrored requests classified by the shadow model",
+    ["agree"],  # true when the candidate's top label matches the primary's
+)
+SHADOW_DROPPED = Counter(
+    "bhojanbuddy_ml_shadow_dropped_total",
+    "Mirrored requests dropped because the shadow queue was full",
+)
+RATE_LIMITED = Counter(
+    "bhojanbuddy_ml_rate_limited_total",
+    "Requests rejected with 429 by the rate limiter",
+    ["route_class"],  # inference, writes, reads
+)
+
+
+def render():
+    """Prometheus text exposition for this process, or all gunicorn workers."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
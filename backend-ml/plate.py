@@ -0,0 +1,163 @@
+"""Plate mode: recognise several dishes in one photo, such as a thali.
+
+The decoded image is split into overlapping grid windows. Windows that are
+mostly empty plate or table are skipped, and the rest are classified together
+with the whole image in one forward pass. Overlapping windows that agree on a
+dish are merged into one detection.
+"""
+import time
+
+import numpy as np
+
+import inference
+import label_table
+from config import (
+    PLATE_BUDGET_SECONDS,
+    PLATE_CONFIDENCE_THRESHOLD,
+    PLATE_GRID,
+    PLATE_MAX_CROPS,
+    PLATE_MIN_SALIENCY,
+    PLATE_WINDOW_SCALE,
+)
+from metrics import PREDICTIONS, STAGE_SECONDS
+
+# Smoothed forward-pass seconds per image, measured on plate batches
+_seconds_per_image = None
+
+
+def grid_windows(grid=PLATE_GRID, scale=PLATE_WINDOW_SCALE):
+    """(grid * grid, 4) normalized x0, y0, x1, y1 boxes of overlapping windows."""
+    starts = np.linspace(0.0, 1.0 - scale, grid)
+    x0, y0 = (a.ravel() for a in np.meshgrid(starts, starts))
+    return np.column_stack([x0, y0, x0 + scale, y0 + scale])
+
+
+def saliency(base, boxes):
+    """Grayscale std-dev of each window, measured on the already resized image."""
+    height, width = base.shape[:2]
+    gray = base.mean(axis=2)
+    pixels = np.rint(boxes * [width, height, width, height]).astype(int)
+    return np.array([gray[y0:y1, x0:x1].std() for x0, y0, x1, y1 in pixels])
+
+
+def crop_budget(elapsed):
+    """How many crops fit in what is left of PLATE_BUDGET_SECONDS."""
+    if _seconds_per_image is None:
+        return PLATE_MAX_CROPS
+    # One image of the batch is the whole photo
+    fits = (PLATE_BUDGET_SECONDS - elapsed) / _seconds_per_image - 1
+    return int(np.clip(fits, 1, PLATE_MAX_CROPS))
+
+
+def _record_cost(seconds, images):
+    global _seconds_per_image
+    cost = seconds / images
+    _seconds_per_image = cost if _seconds_per_image is None else 0.8 * _seconds_per_image + 0.2 * cost
+
+
+def merge_detections(class_ids, confidences, boxes):
+    """Group ids for detections; same-label boxes that overlap (even transitively) share one."""
+    x0 = np.maximum(boxes[:, None, 0], boxes[None, :, 0])
+    y0 = np.maximum(boxes[:, None, 1], boxes[None, :, 1])
+    x1 = np.minimum(boxes[:, None, 2], boxes[None, :, 2])
+    y1 = np.minimum(boxes[:, None, 3], boxes[None, :, 3])
+    linked = (x1 > x0) & (y1 > y0) & (class_ids[:, None] == class_ids[None, :])
+
+    groups = np.full(len(class_ids), -1)
+    count = 0
+    # Most confident first, so group order is detection order
+    for seed in np.argsort(-confidences):
+        if groups[seed] >= 0:
+            continue
+        groups[seed] = count
+        stack = [seed]
+        while stack:
+            for other in np.flatnonzero(linked[stack.pop()] & (groups < 0)):
+                groups[other] = count
+                stack.append(other)
+        count += 1
+    return groups, count
+
+
+def _total_nutrition(table, class_ids, nutrients):
+    rows = table[class_ids]
+    totals = {}
+    for name in nutrients:
+        column = rows[name]
+        if not np.isnan(column).all():
+            totals[name] = round(float(np.nansum(column)), 2)
+    return totals
+
+
+def classify_plate(image):
+    """Classify a plate photo (path or file object) into the /predict?mode=plate response."""
+    started = time.perf_counter()
+    state = inference.load()
+    table = state["table"]
+
+    with STAGE_SECONDS.labels("decode").time():
+        img = inference.decode_image(image)
+        img.load()
+    with STAGE_SECONDS.labels("resize").time():
+        base = inference._to_array(img)
+
+    with STAGE_SECONDS.labels("plate_crops").time():
+        boxes = grid_windows()
+        scores = saliency(base, boxes)
+        # Most textured windows first, so a tight budget drops the emptiest
+        order = np.argsort(-scores)
+        order = order[scores[order] >= PLATE_MIN_SALIENCY][:crop_budget(time.perf_counter() - started)]
+        boxes = boxes[order]
+        width, height = img.size
+        batch = np.stack([base] + [
+            inference._to_array(img, box=tuple(box * [width, height, width, height])) for box in boxes
+        ])
+
+    with STAGE_SECONDS.labels("inference").time():
+        forward_started = time.perf_counter()
+        preds = inference.predict_batch(batch)
+        _record_cost(time.perf_counter() - forward_started, len(batch))
+
+    # The whole photo gets the single-image decision; crop thresholds aren't calibrated
+    whole, crop_preds = inference.calibrated(preds[0]), preds[1:]
+    class_ids = crop_preds.argmax(axis=1)
+    confidences = crop_preds[np.arange(len(class_ids)), class_ids]
+    found = confidences >= PLATE_CONFIDENCE_THRESHOLD
+    class_ids, confidences, boxes = class_ids[found], confidences[found], boxes[found]
+
+    # Nothing on the grid: fall back to the whole photo as one dish
+    best = int(whole.argmax())
+    if not len(class_ids) and whole[best] >= inference.confidence_threshold(best):
+        class_ids = np.array([best])
+        confidences = np.array([whole[best]])
+        boxes = np.array([[0.0, 0.0, 1.0, 1.0]])
+
+    if not len(class_ids):
+        result = {"status": "uncertain", "options": inference.top_options(table, whole), "crops": len(batch) - 1}
+        PREDICTIONS.labels(result["status"]).inc()
+        return result
+
+    groups, count = merge_detections(class_ids, confidences, boxes)
+    dishes = []
+    dish_ids = []
+    for group in range(count):
+        members = groups == group
+        best = np.flatnonzero(members)[confidences[members].argmax()]
+        dish_ids.append(class_ids[best])
+        dishes.append({
+            "label": str(table[class_ids[best]][label_table.LABEL_FIELD]),
+            "confidence": float(confidences[best]),
+            # Union of the merged windows, normalized to the image size
+            "box": [round(float(v), 3) for v in (*boxes[members, :2].min(axis=0), *boxes[members, 2:].max(axis=0))],
+            "crops": int(members.sum()),
+            "nutrition": label_table.nutrition_for(table, class_ids[best], state["nutrients"]),
+        })
+
+    PREDICTIONS.labels("plate").inc()
+    return {
+        "status": "plate",
+        "dishes": dishes,
+        # One serving of each dish
+        "total_nutrition": _total_nutrition(table, np.array(dish_ids), state["nutrients"]),
+        "crops": len(batch) - 1,
+    }
@@ -0,0 +1,47 @@
+import cProfile
+import os
+import time
+import uuid
+
+# Profile a request when profiling is switched on and it carries `X-Profile: 1`
+PROFILING_ENABLED = os.getenv("BHOJANBUDDY_PROFILING", "0") == "1"
+PROFILE_DIR = os.getenv(
+    "BHOJANBUDDY_PROFILE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"),
+)
+
+try:
+    # Sampling profiler: low overhead, readable HTML output
+    from pyinstrument import Profiler
+except ImportError:
+    Profiler = None
+
+
+def wants_profile(headers):
+    return PROFILING_ENABLED and headers.get("X-Profile") == "1"
+
+
+def start():
+    if Profiler is not None:
+        profiler = Profiler()
+        profiler.start()
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    return profiler
+
+
+def stop(profiler, name):
+    """Stop `profiler` and write its report; returns the report path."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stem = f"{time.strftime('%Y%m%d_%H%M%S')}_{name.strip('/').replace('/', '_') or 'root'}_{uuid.uuid4().hex[:6]}"
+    if Profiler is not None:
+        profiler.stop()
+        path = os.path.join(PROFILE_DIR, stem + ".html")
+        with open(path, "w") as f:
+            f.write(profiler.output_html())
+    else:
+        profiler.disable()
+        path = os.path.join(PROFILE_DIR, stem + ".prof")
+        profiler.dump_stats(path)
+    return path
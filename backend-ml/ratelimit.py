@@ -0,0 +1,161 @@
+"""Token-bucket rate limiting for the Flask service.
+
+Same algorithm and SQLite layout as backend/app/core/ratelimit.py, so both
+services can point at one shared store file.
+"""
+import math
+import sqlite3
+import threading
+import time
+
+from config import RATE_LIMITS, RATE_LIMIT_STORE, TRUST_FORWARDED_FOR
+
+INFERENCE = "inference"
+WRITES = "writes"
+READS = "reads"
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# Probes and monitoring are never limited
+EXEMPT_PATHS = ("/", "/healthz", "/readyz", "/metrics")
+
+
+def parse_limit(spec):
+    """Parse "30/minute" into (capacity, refill per second); "off" disables the class.
+
+    Raises ValueError for anything else, so a bad setting fails at startup.
+    Keep in sync with backend/app/core/ratelimit.py.
+    """
+    if spec.strip().lower() in ("", "off", "0"):
+        return None
+    count, _, period = spec.partition("/")
+    period = period.strip().lower() or "second"
+    if period not in PERIODS:
+        raise ValueError(f"Rate limit {spec!r}: period must be one of {', '.join(PERIODS)}")
+    try:
+        capacity = float(count)
+    except ValueError:
+        raise ValueError(f"Rate limit {spec!r}: expected a count such as '30/minute'") from None
+    # A bucket smaller than one token would reject every request
+    if not 1 <= capacity < math.inf:
+        raise ValueError(f"Rate limit {spec!r}: count must be at least 1; use 'off' to disable")
+    return capacity, capacity / PERIODS[period]
+
+
+class MemoryStore:
+    """Token buckets in this process; each gunicorn worker limits independently."""
+
+    def __init__(self, max_keys=100_000):
+        # key -> (tokens, updated, time the bucket is full again)
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.max_keys = max_keys
+
+    def take(self, key, capacity, rate, now):
+        """Take one token; returns 0 if allowed, else seconds until one is available."""
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(key, (capacity, now, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if wait == 0:
+                tokens -= 1
+            self._buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+            if len(self._buckets) > self.max_keys:
+                for k in [k for k, (_, _, full_at) in self._buckets.items() if full_at <= now]:
+                    del self._buckets[k]
+            return wait
+
+
+class SQLiteStore:
+    """Token buckets in a SQLite file shared by every worker on the host."""
+
+    prune_every = 1000
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        # Short-lived connection: this may run in a pre-fork master, and
+        # SQLite connections must not cross fork()
+        conn = sqlite3.connect(path, timeout=5)
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, full_at REAL NOT NULL)"
+            )
+        conn.close()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.calls = 0
+        return conn
+
+    def take(self, key, capacity, rate, now):
+        conn = self._connect()
+        # IMMEDIATE takes the write lock up front, so read-modify-write is atomic
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM rate_limits WHERE key = ?", (key,)).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if wait == 0:
+                tokens -= 1
+            conn.execute(
+                "INSERT INTO rate_limits (key, tokens, updated, full_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated, "
+                "full_at = excluded.full_at",
+                (key, tokens, now, now + (capacity - tokens) / rate),
+            )
+            self._local.calls += 1
+            if self._local.calls % self.prune_every == 0:
+                conn.execute("DELETE FROM rate_limits WHERE full_at <= ?", (now,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+
+def route_class(method, path):
+    if method == "OPTIONS" or path in EXEMPT_PATHS:
+        return None
+    if path == "/predict" and method == "POST":
+        return INFERENCE
+    if method in ("GET", "HEAD"):
+        return READS
+    return WRITES
+
+
+def client_key(request):
+    # Only trust X-Forwarded-For behind a proxy that sets it
+    if TRUST_FORWARDED_FOR and request.headers.get("X-Forwarded-For"):
+        return "ip:" + request.headers["X-Forwarded-For"].split(",")[0].strip()
+    return f"ip:{request.remote_addr}"
+
+
+class RateLimiter:
+    def __init__(self, limits, store=None):
+        self.limits = {name: parse_limit(spec) for name, spec in limits.items()}
+        self.store = store or MemoryStore()
+
+    def check(self, request):
+        """Return (route class, seconds to wait); wait is 0 when the request may proceed."""
+        limit_class = route_class(request.method, request.path)
+        limit = self.limits.get(limit_class)
+        if limit is None:
+            return limit_class, 0.0
+        capacity, rate = limit
+        return limit_class, self.store.take(f"{limit_class}:{client_key(request)}", capacity, rate, time.time())
+
+
+def retry_after(wait):
+    return str(math.ceil(wait))
+
+
+def create_limiter():
+    return RateLimiter(RATE_LIMITS, SQLiteStore(RATE_LIMIT_STORE) if RATE_LIMIT_STORE else MemoryStore())
@@ -0,0 +1,224 @@
+"""Shadow evaluation of a candidate model on live /predict traffic.
+
+A sampled fraction of /predict requests is mirrored to a candidate model after
+the primary response is computed. A background thread per worker decodes the
+mirrored images, classifies them in batches with the candidate, and appends one
+JSON line per image to the shadow log. Nothing on the response path waits for
+it: when the queue is full, mirrored requests are dropped.
+
+Both sides are logged as the raw single-pass softmax (CONFIDENCE_MODE): the
+primary's calibration and TTA are fitted to the primary model only, so
+applying them to one side would skew agreement and confidence.
+
+    python shadow.py report    # agreement, confidence, latency, feedback accuracy
+"""
+import argparse
+import io
+import json
+import os
+import queue
+import random
+import threading
+import time
+
+import numpy as np
+
+from config import (
+    CONFIDENCE_THRESHOLD,
+    SHADOW_BATCH_SIZE,
+    SHADOW_LABEL_MAP_PATH,
+    SHADOW_LOG_PATH,
+    SHADOW_MAX_WAIT,
+    SHADOW_MODEL_PATH,
+    SHADOW_QUEUE_SIZE,
+    SHADOW_SAMPLE_RATE,
+)
+import label_table
+from metrics import SHADOW_DROPPED, SHADOW_PREDICTIONS
+
+_state = {
+    "queue": None,
+    # Worker threads don't survive fork; restart when the pid changes
+    "pid": None,
+    "model": None,
+    "table": None,
+}
+_start_lock = threading.Lock()
+
+# Stored in every record; report() skips records logged another way
+CONFIDENCE_MODE = "raw"
+
+
+def enabled():
+    return bool(SHADOW_MODEL_PATH) and SHADOW_SAMPLE_RATE > 0
+
+
+def _top(table, row):
+    best = int(row.argmax())
+    return str(table[best][label_table.LABEL_FIELD]), float(row[best])
+
+
+def _ensure_worker():
+    if _state["pid"] == os.getpid():
+        return _state["queue"]
+    with _start_lock:
+        if _state["pid"] != os.getpid():
+            _state["queue"] = queue.Queue(maxsize=SHADOW_QUEUE_SIZE)
+            threading.Thread(target=_run, args=(_state["queue"],), name="shadow-model", daemon=True).start()
+            _state["pid"] = os.getpid()
+    return _state["queue"]
+
+
+def submit(image_name, payload, raw, seconds):
+    """Mirror one finished /predict request to the candidate, if sampled.
+
+    `raw` is the primary's uncalibrated single-pass softmax row (see
+    inference.classify_with_raw). Only a queue put happens here; `payload` is
+    the raw upload, decoded later on the shadow thread.
+    """
+    if not enabled() or random.random() >= SHADOW_SAMPLE_RATE:
+        return
+    import inference
+
+    label, confidence = _top(inference.load()["table"], raw)
+    item = {
+        "ts": time.time(),
+        "image_name": image_name,
+        "confidence_mode": CONFIDENCE_MODE,
+        "primary": {"label": label, "confidence": confidence, "seconds": round(seconds, 4)},
+    }
+    try:
+        _ensure_worker().put_nowait((item, payload))
+    except queue.Full:
+        SHADOW_DROPPED.inc()
+
+
+def _load_candidate():
+    import tensorflow as tf
+
+    import inference
+
+    inference.load()  # TensorFlow thread settings and the primary table
+    _state["model"] = tf.keras.models.load_model(SHADOW_MODEL_PATH, compile=False)
+    if SHADOW_LABEL_MAP_PATH:
+        _state["table"] = label_table.build_from_files(SHADOW_LABEL_MAP_PATH, inference.NUTRITION_DB_PATH)
+    else:
+        _state["table"] = inference.load()["table"]
+    outputs = _state["model"].output_shape[-1]
+    if outputs != len(_state["table"]):
+        raise ValueError(f"candidate has {outputs} outputs but its label table has {len(_state['table'])} entries")
+
+
+def _next_batch(items):
+    """Block for one item, then gather more until the batch is full or SHADOW_MAX_WAIT passes."""
+    batch = [items.get()]
+    deadline = time.monotonic() + SHADOW_MAX_WAIT
+    while len(batch) < SHADOW_BATCH_SIZE:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(items.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+
+def _run(items):
+    import inference
+
+    try:
+        _load_candidate()
+    except Exception as e:
+        print(f"Error loading shadow model: {e}")
+        return
+
+    while True:
+        batch = _next_batch(items)
+        # Anything that fails drops this batch only; the thread keeps serving
+        try:
+            started = time.perf_counter()
+            arrays = np.stack([inference._to_array(inference.decode_image(io.BytesIO(p))) for _, p in batch])
+            preds = np.asarray(_state["model"](arrays, training=False))
+            # Decode + forward pass per image, amortised over the batch
+            seconds = (time.perf_counter() - started) / len(batch)
+
+            lines = []
+            for (item, _), row in zip(batch, preds):
+                label, confidence = _top(_state["table"], row)
+                item["candidate"] = {"label": label, "confidence": confidence, "seconds": round(seconds, 4)}
+                item["model"] = os.path.basename(SHADOW_MODEL_PATH)
+                item["agree"] = item["candidate"]["label"] == item["primary"]["label"]
+                SHADOW_PREDICTIONS.labels(str(item["agree"]).lower()).inc()
+                lines.append(json.dumps(item) + "\n")
+            # One append per batch; lines from several workers don't interleave
+            with open(SHADOW_LOG_PATH, "a") as f:
+                f.write("".join(lines))
+        except Exception as e:
+            print(f"Shadow batch failed: {e}")
+
+
+def _summary(confidence, seconds):
+    confidence, seconds = np.asarray(confidence), np.asarray(seconds)
+    histogram, _ = np.histogram(confidence, bins=10, range=(0.0, 1.0))
+    return {
+        "confident_rate": round(float((confidence >= CONFIDENCE_THRESHOLD).mean()), 4),
+        "confidence_mean": round(float(confidence.mean()), 4),
+        "confidence_p10_p50_p90": [round(float(v), 4) for v in np.percentile(confidence, [10, 50, 90])],
+        "confidence_histogram": histogram.tolist(),  # ten bins over [0, 1]
+        "latency_ms_p50_p95": [round(float(v) * 1000, 2) for v in np.percentile(seconds, [50, 95])],
+    }
+
+
+def report(log_path=SHADOW_LOG_PATH, feedback_path=None):
+    """Compare primary and candidate over the shadow log, joined with /feedback by image name."""
+    if feedback_path is None:
+        from inference import MODEL_DIR
+
+        feedback_path = os.path.join(MODEL_DIR, "user_feedback.json")
+
+    records = []
+    if os.path.exists(log_path):
+        with open(log_path) as f:
+            records = [json.loads(line) for line in f if line.strip()]
+    # Older lines mixed a calibrated primary with a raw candidate
+    skipped = sum(r.get("confidence_mode") != CONFIDENCE_MODE for r in records)
+    records = [r for r in records if r.get("confidence_mode") == CONFIDENCE_MODE]
+    if not records:
+        return {"samples": 0, "skipped": skipped}
+
+    result = {
+        "samples": len(records),
+        "skipped": skipped,
+        "confidence_mode": CONFIDENCE_MODE,
+        "models": sorted({r["model"] for r in records}),
+        "agreement": round(float(np.mean([r["agree"] for r in records])), 4),
+    }
+    for side in ("primary", "candidate"):
+        result[side] = _summary([r[side]["confidence"] for r in records], [r[side]["seconds"] for r in records])
+
+    # Latest correction per image wins
+    corrections = {}
+    if os.path.exists(feedback_path):
+        with open(feedback_path) as f:
+            corrections = {fb["image_name"]: fb["correct_label"] for fb in json.load(f)}
+    joined = [r for r in records if r["image_name"] in corrections]
+    result["feedback"] = {"samples": len(joined)}
+    if joined:
+        for side in ("primary", "candidate"):
+            correct = [r[side]["label"] == corrections[r["image_name"]] for r in joined]
+            result["feedback"][f"{side}_accuracy"] = round(float(np.mean(correct)), 4)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shadow model evaluation")
+    parser.add_argument("command", choices=["report"])
+    parser.add_argument("--log", default=SHADOW_LOG_PATH)
+    parser.add_argument("--feedback", help="default: model/user_feedback.json")
+    args = parser.parse_args()
+    print(json.dumps(report(args.log, args.feedback), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Uploads go to a scratch directory; the limiter is swapped in per test
+os.environ["BHOJANBUDDY_ML_DATA_DIR"] = tempfile.mkdtemp(prefix="bhojanbuddy-ml-tests-")
+os.environ["BHOJANBUDDY_RATE_LIMIT"] = "0"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def ml_app():
+    import app
+
+    return app
+
+
+@pytest.fixture
+def client(ml_app):
+    return ml_app.app.test_client()
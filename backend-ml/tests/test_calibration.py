@@ -0,0 +1,36 @@
+import pytest
+
+import calibration
+
+
+@pytest.fixture
+def fitted(tmp_path):
+    model_path = tmp_path / "food_model.h5"
+    model_path.write_bytes(b"weights")
+
+    def write(**fields):
+        path = tmp_path / "calibration.json"
+        calibration.save(dict({
+            "model_sha256": calibration.model_fingerprint(model_path),
+            "temperature": 1.5,
+            "thresholds": [0.4, 0.6],
+        }, **fields), str(path))
+        return str(path), str(model_path)
+
+    return write
+
+
+@pytest.mark.parametrize("tta", [True, False])
+def test_load_applies_matching_tta_setting(fitted, tta):
+    temperature, thresholds = calibration.load(*fitted(tta=tta), num_classes=2, tta=tta)
+    assert temperature == 1.5
+    assert thresholds.tolist() == [0.4, 0.6]
+
+
+@pytest.mark.parametrize("fields, serving_tta", [
+    ({"tta": True}, False),
+    ({"tta": False}, True),
+    ({}, True),  # fitted before the key existed: single-pass thresholds
+])
+def test_load_ignores_other_tta_setting(fitted, fields, serving_tta):
+    assert calibration.load(*fitted(**fields), num_classes=2, tta=serving_tta) is None
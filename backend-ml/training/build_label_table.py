@@ -0,0 +1,32 @@
+"""Compile model/label_map.json and model/nutrition_db.json into model/label_table.npy.
+
+Run after training (train.py calls it) or whenever nutrition_db.json changes:
+
+    python backend-ml/training/build_label_table.py
+"""
+import os
+import sys
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(base_dir))
+
+import label_table  # noqa: E402
+from config import MODEL_DIR  # noqa: E402
+
+LABEL_MAP_PATH = os.path.join(MODEL_DIR, "label_map.json")
+NUTRITION_DB_PATH = os.path.join(MODEL_DIR, "nutrition_db.json")
+LABEL_TABLE_PATH = os.path.join(MODEL_DIR, "label_table.npy")
+
+
+def build_label_table(label_map_path=LABEL_MAP_PATH, nutrition_db_path=NUTRITION_DB_PATH,
+                      out_path=LABEL_TABLE_PATH):
+    table = label_table.build_from_files(label_map_path, nutrition_db_path)
+    label_table.save(table, out_path)
+    missing = int((~label_table.has_nutrition(table)).sum())
+    print(f"✅ Label table saved to {out_path}: {len(table)} classes, "
+          f"{len(label_table.nutrient_names(table))} nutrients, {missing} classes without nutrition")
+    return table
+
+
+if __name__ == "__main__":
+    build_label_table()
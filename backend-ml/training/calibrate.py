@@ -0,0 +1,178 @@
+"""Fit model/calibration.json for the model that will be served.
+
+Runs the model over the validation split and the images users corrected
+through /feedback, with the same preprocessing as serving. It then fits a
+softmax temperature and per-class confidence thresholds (see calibration.py).
+With TTA on (serving's BHOJANBUDDY_ML_TTA by default), the thresholds are
+fitted on the probabilities serving decides on: the single pass for confident
+images, the TTA average for the rest.
+train.py calls it after training; re-run it whenever the model or the
+feedback log changes:
+
+    python backend-ml/training/calibrate.py --model backend-ml/model/food_model.h5
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(base_dir))
+
+import calibration  # noqa: E402
+import inference  # noqa: E402
+from config import CONFIDENCE_THRESHOLD, DATA_DIR, TTA_ENABLED  # noqa: E402
+
+VAL_DIR = os.path.join(base_dir, "dataset", "val")
+FEEDBACK_PATH = os.path.join(inference.MODEL_DIR, "user_feedback.json")
+CALIBRATION_PATH = inference.CALIBRATION_PATH
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif')
+
+
+def collect_samples(label_ids, val_dir=VAL_DIR, feedback_path=FEEDBACK_PATH, data_dir=DATA_DIR):
+    """(path, class id) pairs from val/<label>/ and from feedback corrections."""
+    val = []
+    if os.path.isdir(val_dir):
+        for label in sorted(os.listdir(val_dir)):
+            class_dir = os.path.join(val_dir, label)
+            if label not in label_ids or not os.path.isdir(class_dir):
+                continue
+            val.extend(
+                (os.path.join(class_dir, name), label_ids[label])
+                for name in sorted(os.listdir(class_dir))
+                if name.lower().endswith(IMAGE_EXTENSIONS)
+            )
+
+    feedback = []
+    if os.path.exists(feedback_path):
+        with open(feedback_path, "r") as f:
+            # Latest correction per image wins
+            corrections = {fb["image_name"]: fb["correct_label"] for fb in json.load(f)}
+        for image_name, label in sorted(corrections.items()):
+            path = os.path.join(data_dir, os.path.basename(image_name))
+            if label in label_ids and os.path.exists(path):
+                feedback.append((path, label_ids[label]))
+    return val, feedback
+
+
+def predict_probs(model, paths, batch_size=32, tta=False):
+    """Raw softmax rows (N, C), plus the TTA views' rows (N, views, C) when `tta` is set."""
+    rows, view_rows = [], []
+    for start in range(0, len(paths), batch_size):
+        images = [inference.decode_image(path) for path in paths[start:start + batch_size]]
+        batch = np.stack([inference._to_array(img) for img in images])
+        rows.append(np.asarray(model(batch, training=False)))
+        if tta:
+            views = np.stack([inference.augmented_views(img, base) for img, base in zip(images, batch)])
+            preds = np.asarray(model(views.reshape(-1, *views.shape[2:]), training=False))
+            view_rows.append(preds.reshape(len(images), views.shape[1], -1))
+    probs = np.concatenate(rows).astype(np.float64)
+    return probs, (np.concatenate(view_rows).astype(np.float64) if tta else None)
+
+
+def served_probs(scaled, scaled_views, thresholds):
+    """What inference.classify decides on: the single pass if confident, else the TTA average."""
+    averaged = (scaled + scaled_views.sum(axis=1)) / (scaled_views.shape[1] + 1)
+    predicted = scaled.argmax(axis=1)
+    confident = scaled.max(axis=1) >= thresholds[predicted]
+    return np.where(confident[:, None], scaled, averaged)
+
+
+def decision_summary(probs, labels, thresholds):
+    """Uncertain rate and precision of the confident answers."""
+    predicted = probs.argmax(axis=1)
+    confident = probs.max(axis=1) >= thresholds[predicted]
+    correct = predicted == labels
+    return {
+        "uncertain_rate": round(float(1 - confident.mean()), 4),
+        "confident_precision": round(float(correct[confident].mean()), 4) if confident.any() else None,
+        "accuracy": round(float(correct.mean()), 4),
+    }
+
+
+def calibrate(model_path=inference.MODEL_PATH, out_path=CALIBRATION_PATH, target_precision=0.9,
+              min_samples=20, val_dir=VAL_DIR, feedback_path=FEEDBACK_PATH, data_dir=DATA_DIR,
+              tta=TTA_ENABLED):
+    import tensorflow as tf
+
+    with open(inference.LABEL_MAP_PATH, "r") as f:
+        label_map = json.load(f)
+    label_ids = {label: int(i) for i, label in label_map.items()}
+    num_classes = max(label_ids.values()) + 1
+
+    val, feedback = collect_samples(label_ids, val_dir, feedback_path, data_dir)
+    samples = val + feedback
+    if not samples:
+        print("❌ No validation images or feedback images found; calibration skipped.")
+        return None
+
+    model = tf.keras.models.load_model(model_path, compile=False)
+    probs, view_probs = predict_probs(model, [path for path, _ in samples], tta=tta)
+    labels = np.array([class_id for _, class_id in samples])
+    if probs.shape[1] != num_classes:
+        raise ValueError(f"Model has {probs.shape[1]} outputs but label_map.json has {num_classes} classes")
+
+    temperature = calibration.fit_temperature(probs, labels)
+    scaled = calibration.apply_temperature(probs, temperature)
+    thresholds, global_threshold = calibration.fit_thresholds(
+        scaled, labels, target_precision, min_samples, CONFIDENCE_THRESHOLD
+    )
+    if tta:
+        # Serving scales each view, then averages. The single-pass thresholds
+        # pick which images get TTA; refit on what serving then decides on.
+        scaled = served_probs(scaled, calibration.apply_temperature(view_probs, temperature), thresholds)
+        thresholds, global_threshold = calibration.fit_thresholds(
+            scaled, labels, target_precision, min_samples, CONFIDENCE_THRESHOLD
+        )
+
+    result = {
+        "model_file": os.path.basename(model_path),
+        "model_sha256": calibration.model_fingerprint(model_path),
+        "fitted_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "samples": {"val": len(val), "feedback": len(feedback)},
+        "target_precision": target_precision,
+        # Serving ignores the file unless BHOJANBUDDY_ML_TTA matches
+        "tta": tta,
+        "temperature": round(temperature, 4),
+        "nll": {
+            "before": round(calibration.nll(probs, labels, 1.0), 4),
+            "after": round(calibration.nll(probs, labels, temperature), 4),
+        },
+        "global_threshold": round(global_threshold, 4),
+        # In-sample: the same images were used to fit
+        "decision": {
+            "before": decision_summary(probs, labels, np.full(num_classes, CONFIDENCE_THRESHOLD)),
+            "after": decision_summary(scaled, labels, thresholds),
+        },
+        "thresholds": [round(float(t), 4) for t in thresholds],
+    }
+    calibration.save(result, out_path)
+    print(f"✅ Calibration saved to {out_path}: T={result['temperature']}, "
+          f"uncertain rate {result['decision']['before']['uncertain_rate']} -> "
+          f"{result['decision']['after']['uncertain_rate']}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit temperature scaling and per-class thresholds")
+    parser.add_argument("--model", default=inference.MODEL_PATH)
+    parser.add_argument("--out", default=CALIBRATION_PATH)
+    parser.add_argument("--val-dir", default=VAL_DIR)
+    parser.add_argument("--feedback", default=FEEDBACK_PATH)
+    parser.add_argument("--data-dir", default=DATA_DIR, help="where /predict saved the feedback images")
+    parser.add_argument("--target-precision", type=float, default=0.9,
+                        help="precision the confident answers of each class must reach")
+    parser.add_argument("--min-samples", type=int, default=20,
+                        help="classes with fewer top-1 predictions use the global threshold")
+    parser.add_argument("--tta", action=argparse.BooleanOptionalAction, default=TTA_ENABLED,
+                        help="fit for serving with TTA (default: BHOJANBUDDY_ML_TTA)")
+    args = parser.parse_args()
+    calibrate(args.model, args.out, args.target_precision, args.min_samples,
+              args.val_dir, args.feedback, args.data_dir, args.tta)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,15 @@
 import os
 import json
+import shutil
 from PIL import Image
 import tensorflow as tf
 import matplotlib.pyplot as plt
 from collections import Counter
 import numpy as np
 
+from build_label_table import build_label_table
+from calibrate import calibrate
+
 # Enable mixed precision
 mixed_precision = tf.keras.mixed_precision
 layers = tf.keras.layers
@@ -90,6 +94,8 @@ class_names = train_ds.class_names
 label_map = {i: name for i, name in enumerate(class_names)}
 with open(os.path.join(model_dir, "label_map.json"), "w") as f:
     json.dump(label_map, f)
+# Compiled label/nutrition table that serving memory-maps
+build_label_table()
 
 # Compute class weights
 train_labels = np.concatenate([y.numpy() for _, y in train_ds])
@@ -209,7 +215,12 @@ plot_history(history)
 
 saved_model_path = os.path.join(model_dir, "saved_model")
 model.save(saved_model_path, save_format="tf")
-model.save(os.path.join(model_dir, "food_model_final.h5"))
+final_model_path = os.path.join(model_dir, "food_model_final.h5")
+model.save(final_model_path)
+# Serving loads food_model.h5; a byte copy keeps the calibration hash valid for it
+serving_model_path = os.path.join(model_dir, "food_model.h5")
+shutil.copyfile(final_model_path, serving_model_path)
+print(f"✅ Serving model saved to {serving_model_path}")
 
 converter = tf.lite.TFLiteConverter.from_saved_model(saved_model_path)
 converter.optimizations = [tf.lite.Optimize.DEFAULT]
@@ -227,6 +238,12 @@ try:
 except Exception as e:
     print(f"❌ TFLite conversion failed: {e}")
 
+# ----------------------------- Calibrate Confidence -----------------------------
+
+# Temperature and per-class thresholds for serving's confident/uncertain decision,
+# tied by its hash to the file serving loads
+calibrate(serving_model_path, val_dir=val_dir)
+
 # ----------------------------- Save Training History -----------------------------
 
 def serialize_history(hist):
@@ -1,28 +1,72 @@
 import os
 import shutil
 import random
+import sys
+from collections import Counter
 
-def split_dataset(source_dir, train_dir, val_dir, split_ratio=0.8):
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import image_index  # noqa: E402
+from config import IMAGE_INDEX_PATH, NEAR_DUPLICATE_DISTANCE  # noqa: E402
+
+
+def split_dataset(source_dir, train_dir, val_dir, split_ratio=0.8, dedup=True,
+                  radius=NEAR_DUPLICATE_DISTANCE, index_path=IMAGE_INDEX_PATH):
+    """Copy source_dir/<class>/<image> into train and val.
+
+    With `dedup`, byte-identical copies within a class are copied once, and
+    each cluster of near duplicates goes to one side, so val never holds a
+    near copy of a training image. Hashes come from the image index, which
+    only re-hashes new or changed files.
+    """
     os.makedirs(train_dir, exist_ok=True)
     os.makedirs(val_dir, exist_ok=True)
 
+    images = []  # (class name, path)
     for class_name in os.listdir(source_dir):
         class_path = os.path.join(source_dir, class_name)
         if not os.path.isdir(class_path):
             continue
+        names = os.listdir(class_path)
+        if dedup:
+            names = [name for name in names if name.lower().endswith(image_index.IMAGE_EXTENSIONS)]
+        images.extend((class_name, os.path.join(class_path, name)) for name in names)
 
-        images = os.listdir(class_path)
-        random.shuffle(images)
-        split_idx = int(len(images) * split_ratio)
+    if dedup:
+        entries = image_index.load(index_path)
+        image_index.update(entries, [source_dir])
+        image_index.save(entries, index_path)
+        by_key = {image_index.index_key(path): (class_name, path) for class_name, path in images}
+        groups = []
+        duplicates = 0
+        for cluster in image_index.clusters(entries, list(by_key), radius):
+            # One copy per class of byte-identical files
+            seen = set()
+            group = []
+            for key in cluster:
+                class_name, path = by_key[key]
+                if (class_name, entries[key]["sha256"]) in seen:
+                    duplicates += 1
+                    continue
+                seen.add((class_name, entries[key]["sha256"]))
+                group.append((class_name, path))
+            groups.append(group)
+        print(f"Skipped {duplicates} exact duplicates; "
+              f"{sum(len(g) > 1 for g in groups)} near-duplicate clusters kept on one side")
+    else:
+        groups = [[image] for image in images]
 
-        for img in images[:split_idx]:
-            src = os.path.join(class_path, img)
-            dst_dir = os.path.join(train_dir, class_name)
+    # Shuffled clusters fill each class's train share, the rest go to val;
+    # a cluster follows its most common class
+    random.shuffle(groups)
+    totals = Counter(class_name for group in groups for class_name, _ in group)
+    in_train = Counter()
+    for group in groups:
+        main_class = Counter(class_name for class_name, _ in group).most_common(1)[0][0]
+        to_train = in_train[main_class] < int(totals[main_class] * split_ratio)
+        for class_name, src in group:
+            if to_train:
+                in_train[class_name] += 1
+            dst_dir = os.path.join(train_dir if to_train else val_dir, class_name)
             os.makedirs(dst_dir, exist_ok=True)
             shutil.copy(src, dst_dir)
-
-        for img in images[split_idx:]:
-            src = os.path.join(class_path, img)
-            dst_dir = os.path.join(val_dir, class_name)
-            os.makedirs(dst_dir, exist_ok=True)
-            shutil.copy(src, dst_dir)
\ No newline at end of file
@@ -0,0 +1,202 @@
+"""Snapshot the serving database into the columnar analytics store.
+
+Reads SQLite directly (read-only, in chunks) and writes food_entries and
+bmi_records partitioned by week plus a users snapshot, so cohort reports never
+touch the serving database.
+
+    cd backend && python -m analytics.export --db bhojanbuddy.db --out analytics_store
+"""
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from analytics.store import NPY, PARQUET, default_format, write_metadata, write_part
+
+NUTRIENTS = ["calories", "protein", "carbs", "fat", "saturated_fat", "fiber",
+             "sugar", "cholesterol", "sodium", "calcium", "iron"]
+MODES = ["beast", "swasthya"]
+GENDERS = ["male", "female", "other"]
+# Diseases are stored as bits of an int64 mask
+MAX_DISEASES = 63
+
+CHUNK_ROWS = 200_000
+SECONDS_PER_DAY = 86400
+
+
+def week_start_days(epoch_seconds: np.ndarray) -> np.ndarray:
+    """Days since 1970-01-01 of the Monday starting each timestamp's week."""
+    days = epoch_seconds // SECONDS_PER_DAY
+    # 1970-01-01 was a Thursday, so Monday-based weeks are offset by 3 days
+    return days - (days + 3) % 7
+
+
+def _mode_code(value):
+    if value is None:
+        return -1
+    value = value.lower()
+    return MODES.index(value) if value in MODES else -1
+
+
+class _PartitionWriter:
+    """Buffers rows per week and writes a part file once the stream is past that week.
+
+    Rows arrive in id order, which mostly follows time, so a week is written
+    as soon as a chunk starts after it. Backdated rows can still keep old weeks
+    open; whenever `flush_rows` rows are buffered in total, every buffer is
+    written, and later rows of a week go into its next part.
+    """
+
+    def __init__(self, table_dir, fmt, flush_rows=CHUNK_ROWS):
+        self.table_dir = table_dir
+        self.fmt = fmt
+        self.flush_rows = flush_rows
+        self.buffers = defaultdict(list)
+        self.buffered = 0
+        self.parts = defaultdict(int)
+        self.rows = 0
+
+    def add(self, columns):
+        weeks = week_start_days(columns["created_at"])
+        for week in np.unique(weeks):
+            mask = weeks == week
+            self.buffers[week].append({name: values[mask] for name, values in columns.items()})
+            self.buffered += int(mask.sum())
+        for week in [w for w in self.buffers if w < weeks.min()]:
+            self._flush(week)
+        if self.buffered >= self.flush_rows:
+            self.close()
+
+    def _flush(self, week):
+        chunks = self.buffers.pop(week, [])
+        if not chunks:
+            return
+        columns = {name: np.concatenate([c[name] for c in chunks]) for name in chunks[0]}
+        self.buffered -= len(columns["id"])
+        label = str(np.datetime64(int(week), "D"))
+        write_part(os.path.join(self.table_dir, f"week={label}"), self.parts[week], columns, self.fmt)
+        self.parts[week] += 1
+        self.rows += len(columns["id"])
+
+    def close(self):
+        for week in list(self.buffers):
+            self._flush(week)
+        return self.rows
+
+
+def _export_records(conn, table, value_columns, string_columns, out_dir, fmt, vocab):
+    select = ", ".join(
+        ["id", "user_id", "CAST(strftime('%s', created_at) AS INTEGER)", "mode"]
+        + value_columns + string_columns
+    )
+    cursor = conn.execute(f"SELECT {select} FROM {table} ORDER BY id")
+    writer = _PartitionWriter(os.path.join(out_dir, table), fmt)
+    while True:
+        rows = cursor.fetchmany(CHUNK_ROWS)
+        if not rows:
+            break
+        cols = list(zip(*rows))
+        columns = {
+            "id": np.asarray(cols[0], dtype=np.int64),
+            "user_id": np.asarray(cols[1], dtype=np.int64),
+            "created_at": np.asarray([c if c is not None else 0 for c in cols[2]], dtype=np.int64),
+            "mode": np.asarray([_mode_code(m) for m in cols[3]], dtype=np.int8),
+        }
+        for i, name in enumerate(value_columns, start=4):
+            # None -> NaN so missing nutrients drop out of averages
+            columns[name] = np.asarray(cols[i], dtype=np.float64)
+        for i, name in enumerate(string_columns, start=4 + len(value_columns)):
+            codes = vocab.setdefault(name, {})
+            columns[name] = np.asarray([codes.setdefault(v, len(codes)) for v in cols[i]], dtype=np.int32)
+        writer.add(columns)
+    return writer.close()
+
+
+def _export_users(conn, out_dir, fmt, diseases_vocab):
+    rows = conn.execute("SELECT id, age, gender, diseases FROM users ORDER BY id").fetchall()
+    user_ids = np.asarray([r[0] for r in rows], dtype=np.int64)
+    ages = np.asarray([r[1] if r[1] is not None else -1 for r in rows], dtype=np.int16)
+    genders = np.asarray(
+        [GENDERS.index(r[2].lower()) if r[2] and r[2].lower() in GENDERS else -1 for r in rows], dtype=np.int8
+    )
+    # Diseases JSON array -> bitmask over a vocabulary stored in metadata.json
+    masks = np.zeros(len(rows), dtype=np.int64)
+    for i, (_, _, _, diseases) in enumerate(rows):
+        for disease in (json.loads(diseases) if isinstance(diseases, str) else diseases) or []:
+            if disease not in diseases_vocab:
+                if len(diseases_vocab) >= MAX_DISEASES:
+                    raise ValueError(
+                        f"More than {MAX_DISEASES} distinct diseases; the users snapshot can't encode '{disease}'"
+                    )
+                diseases_vocab.append(disease)
+            masks[i] |= 1 << diseases_vocab.index(disease)
+    write_part(os.path.join(out_dir, "users", "snapshot=current"), 0,
+               {"id": user_ids, "age": ages, "gender": genders, "diseases": masks}, fmt)
+    return len(rows)
+
+
+def export(db_path: str, out_dir: str, fmt: str = None) -> dict:
+    """Write a fresh snapshot to `out_dir`, replacing the previous one atomically."""
+    fmt = fmt or default_format()
+    started = time.time()
+    tmp_dir = out_dir.rstrip("/") + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    # Read-only connection: the export never takes a write lock on the serving DB
+    conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    try:
+        vocab = {}
+        diseases_vocab = []
+        counts = {
+            "users": _export_users(conn, tmp_dir, fmt, diseases_vocab),
+            "food_entries": _export_records(conn, "food_entries", NUTRIENTS, ["food_name"], tmp_dir, fmt, vocab),
+            "bmi_records": _export_records(conn, "bmi_records", ["height", "weight", "bmi"], [], tmp_dir, fmt, vocab),
+        }
+    finally:
+        conn.close()
+
+    metadata = {
+        "exported_at": int(started),
+        "format": fmt,
+        "source": os.path.abspath(db_path),
+        "rows": counts,
+        "vocab": {
+            "mode": MODES,
+            "gender": GENDERS,
+            "diseases": diseases_vocab,
+            # code -> string, in code order
+            **{name: list(codes) for name, codes in vocab.items()},
+        },
+    }
+    write_metadata(tmp_dir, metadata)
+
+    # Swap by renames: out_dir is only missing between two renames, never
+    # while the old snapshot is being deleted
+    backup_dir = out_dir.rstrip("/") + ".old"
+    shutil.rmtree(backup_dir, ignore_errors=True)
+    if os.path.exists(out_dir):
+        os.replace(out_dir, backup_dir)
+    os.replace(tmp_dir, out_dir)
+    shutil.rmtree(backup_dir, ignore_errors=True)
+    metadata["seconds"] = round(time.time() - started, 3)
+    return metadata
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default="bhojanbuddy.db")
+    parser.add_argument("--out", default="analytics_store")
+    parser.add_argument("--format", choices=[PARQUET, NPY], help="default: parquet if pyarrow is installed")
+    args = parser.parse_args()
+    metadata = export(args.db, args.out, args.format)
+    print(json.dumps({k: metadata[k] for k in ("format", "rows", "seconds")}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Cohort reports over the analytics store.
+
+Every report streams the store one weekly partition at a time and aggregates
+with NumPy (lookup arrays indexed by user id, bincount for group sums), so it
+never queries the serving database.
+
+    cd backend && python -m analytics.reports --store analytics_store \\
+        --nutrient sodium --disease Hypertension --format csv
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+from typing import List, Optional
+
+import numpy as np
+
+from analytics.export import NUTRIENTS, SECONDS_PER_DAY
+from analytics.store import iter_partitions, read_metadata, read_part, read_table
+
+# Same buckets as nutrient_targets_disease_age.csv, plus under-18 and unknown
+AGE_GROUPS = ["<18", "18-30", "31-50", "51+"]
+UNKNOWN = "unknown"
+
+
+def age_group_codes(ages: np.ndarray) -> np.ndarray:
+    """Map ages to indexes into AGE_GROUPS; missing ages (-1) map to len(AGE_GROUPS)."""
+    codes = np.digitize(ages, [18, 31, 51])
+    codes[ages < 0] = len(AGE_GROUPS)
+    return codes
+
+
+def _disease_names(name: str) -> set:
+    """Lower-cased full name, base name and abbreviation, as in recommendations._csv_disease."""
+    return {
+        candidate.strip().lower()
+        for candidate in (name, re.sub(r"\s*\(.*?\)", "", name), re.sub(r"^.*?\((.*?)\)", r"\1", name))
+        if candidate.strip()
+    }
+
+
+def disease_mask(vocab: List[str], disease: str) -> np.int64:
+    """Bitmask of the stored diseases matching `disease`; ValueError lists the valid names."""
+    wanted = disease.strip().lower()
+    mask = np.int64(0)
+    for bit, name in enumerate(vocab):
+        if wanted in _disease_names(name):
+            mask |= np.int64(1) << bit
+    if not mask:
+        raise ValueError(f"Unknown disease '{disease}'; the snapshot has: {', '.join(vocab) or 'none'}")
+    return mask
+
+
+def _user_lookups(store_dir: str, disease: Optional[str]):
+    """Arrays indexed by user id: age group code and whether the user is in the cohort."""
+    users = read_table(os.path.join(store_dir, "users"))
+    if not users:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)
+    size = int(users["id"].max()) + 1
+    groups = np.full(size, len(AGE_GROUPS), dtype=np.int64)
+    groups[users["id"]] = age_group_codes(users["age"].astype(np.int64))
+
+    member = np.zeros(size, dtype=bool)
+    if disease is None:
+        member[users["id"]] = True
+    else:
+        mask = disease_mask(read_metadata(store_dir)["vocab"]["diseases"], disease)
+        member[users["id"]] = (users["diseases"] & mask) != 0
+    return groups, member
+
+
+def daily_nutrient_by_cohort(
+    store_dir: str,
+    nutrient: str,
+    disease: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+) -> List[dict]:
+    """Average per-user daily intake of `nutrient`, by week and age group.
+
+    A user-day counts once however many entries it has; entries with a missing
+    nutrient value contribute nothing. Weeks are `YYYY-MM-DD` Mondays and
+    `since`/`until` bound them inclusively.
+    """
+    if nutrient not in NUTRIENTS:
+        raise ValueError(f"Unknown nutrient '{nutrient}'")
+
+    groups, member = _user_lookups(store_dir, disease)
+    labels = AGE_GROUPS + [UNKNOWN]
+    rows = []
+
+    for week, parts in iter_partitions(os.path.join(store_dir, "food_entries")):
+        if (since and week < since) or (until and week > until):
+            continue
+        sums = np.zeros(len(labels))
+        user_days = np.zeros(len(labels), dtype=np.int64)
+        users = [set() for _ in labels]
+
+        for path in parts:
+            cols = read_part(path, ["user_id", "created_at", nutrient])
+            user_ids = np.asarray(cols["user_id"])
+            # Ignore entries of users missing from (or added after) the snapshot
+            known = user_ids < len(member)
+            known[known] = member[user_ids[known]]
+            if not known.any():
+                continue
+            user_ids = user_ids[known]
+            days = np.asarray(cols["created_at"])[known] // SECONDS_PER_DAY
+            values = np.nan_to_num(np.asarray(cols[nutrient], dtype=np.float64)[known])
+
+            # One key per (user, day); bincount sums each user-day's entries
+            keys, inverse = np.unique(user_ids * 100_000 + days, return_inverse=True)
+            day_totals = np.bincount(inverse, weights=values, minlength=len(keys))
+            key_users = keys // 100_000
+            key_groups = groups[key_users]
+
+            sums += np.bincount(key_groups, weights=day_totals, minlength=len(labels))
+            user_days += np.bincount(key_groups, minlength=len(labels))
+            for code in np.unique(key_groups):
+                users[code].update(np.unique(key_users[key_groups == code]).tolist())
+
+        for code, label in enumerate(labels):
+            if user_days[code]:
+                rows.append({
+                    "week": week,
+                    "age_group": label,
+                    "users": len(users[code]),
+                    "user_days": int(user_days[code]),
+                    f"avg_daily_{nutrient}": round(float(sums[code] / user_days[code]), 2),
+                })
+    return rows
+
+
+def write_rows(rows: List[dict], fmt: str, out=sys.stdout) -> None:
+    if fmt == "json":
+        json.dump(rows, out, indent=2)
+        out.write("\n")
+        return
+    if not rows:
+        return
+    writer = csv.DictWriter(out, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--store", default="analytics_store")
+    parser.add_argument("--nutrient", default="sodium", choices=NUTRIENTS)
+    parser.add_argument("--disease", help="restrict to users with this disease, e.g. Hypertension")
+    parser.add_argument("--since", help="first week (YYYY-MM-DD)")
+    parser.add_argument("--until", help="last week (YYYY-MM-DD)")
+    parser.add_argument("--format", choices=["json", "csv"], default="json")
+    args = parser.parse_args()
+    try:
+        rows = daily_nutrient_by_cohort(args.store, args.nutrient, args.disease, args.since, args.until)
+    except ValueError as e:
+        parser.error(str(e))
+    write_rows(rows, args.format)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Columnar file store used by the analytics export and reports.
+
+A table is a directory of partitions (`week=YYYY-MM-DD/`), each holding one or
+more parts. With pyarrow installed a part is a Parquet file; otherwise it is a
+directory with one `.npy` file per column, which NumPy can memory-map. Both
+hold only numeric columns; strings are dictionary-encoded by the exporter.
+"""
+import json
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+PARQUET = "parquet"
+NPY = "npy"
+
+
+def default_format() -> str:
+    return PARQUET if pq is not None else NPY
+
+
+def write_part(partition_dir: str, part: int, columns: Dict[str, np.ndarray], fmt: str) -> None:
+    os.makedirs(partition_dir, exist_ok=True)
+    if fmt == PARQUET:
+        table = pa.table({name: pa.array(values) for name, values in columns.items()})
+        pq.write_table(table, os.path.join(partition_dir, f"part-{part:05d}.parquet"))
+    else:
+        part_dir = os.path.join(partition_dir, f"part-{part:05d}.npy.d")
+        os.makedirs(part_dir, exist_ok=True)
+        for name, values in columns.items():
+            np.save(os.path.join(part_dir, f"{name}.npy"), values)
+
+
+def read_part(path: str, columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+    if path.endswith(".parquet"):
+        table = pq.read_table(path, columns=columns)
+        return {name: table.column(name).to_numpy() for name in table.column_names}
+    names = columns or [f[:-4] for f in sorted(os.listdir(path)) if f.endswith(".npy")]
+    # mmap: only the pages a report touches are read from disk
+    return {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in names}
+
+
+def iter_partitions(table_dir: str) -> Iterator[Tuple[str, List[str]]]:
+    """Yield (partition value, part paths) in partition order."""
+    if not os.path.isdir(table_dir):
+        return
+    for partition in sorted(os.listdir(table_dir)):
+        partition_dir = os.path.join(table_dir, partition)
+        if not os.path.isdir(partition_dir) or "=" not in partition:
+            continue
+        parts = [os.path.join(partition_dir, p) for p in sorted(os.listdir(partition_dir))
+                 if p.endswith(".parquet") or p.endswith(".npy.d")]
+        yield partition.split("=", 1)[1], parts
+
+
+def read_table(table_dir: str, columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+    """Concatenate every part of a (small) table; use iter_partitions for big ones."""
+    chunks = [read_part(path, columns) for _, parts in iter_partitions(table_dir) for path in parts]
+    if not chunks:
+        return {}
+    return {name: np.concatenate([np.asarray(c[name]) for c in chunks]) for name in chunks[0]}
+
+
+def write_metadata(store_dir: str, metadata: dict) -> None:
+    with open(os.path.join(store_dir, "metadata.json"), "w") as f:
+        json.dump(metadata, f, indent=2)
+
+
+def read_metadata(store_dir: str) -> dict:
+    with open(os.path.join(store_dir, "metadata.json")) as f:
+        return json.load(f)
@@ -5,6 +5,8 @@ from app.db.database import get_db
 from app.models.user import User
 from app.schemas.user import User as UserSchema, UserUpdate
 from app.core.security import get_current_user, get_password_hash
+from app.core.tasks import task_queue
+from app.services.side_effects import log_profile_update
 
 router = APIRouter()
 
@@ -57,11 +59,15 @@ async def update_user(
     if user_update.diseases is not None:
         current_user.diseases = user_update.diseases
     
-    # Print debug information
-    print(f"Updating user {current_user.id} with mode: {current_user.preferred_mode}")
-    print(f"Updated user fields: {user_update.dict(exclude_unset=True)}")
-    
     db.commit()
     db.refresh(current_user)
     
+    # Debug log of the change runs after the response (never logs the password)
+    await task_queue.enqueue(
+        log_profile_update,
+        current_user.id,
+        str(current_user.preferred_mode),
+        user_update.dict(exclude_unset=True, exclude={"password"}),
+    )
+    
     return current_user
\ No newline at end of file
@@ -1,15 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal
 
 from app.db.database import get_db
 from app.models.bmi import BMIRecord
-from app.schemas.bmi import BMIRecordCreate, BMIRecord as BMIRecordSchema
+from app.schemas.bmi import BMIRecordCreate, BMIRecord as BMIRecordSchema, BMITrend
 from app.core.security import get_current_user
 from app.models.user import User
+from app.core.metrics import observe_stage
+from app.core.responses import FastJSONResponse, rows_to_content
+from app.core.caching import BMI, bump_version, check_not_modified
+from app.services.sync import record_deletion
+from app.services.bmi import bmi_category, compute_bmi, get_trend
 
 router = APIRouter()
 
+# Columns returned by the history endpoint, in BMIRecordSchema field order
+HISTORY_FIELDS = ["height", "weight", "bmi", "bmi_category", "mode", "id", "user_id", "created_at"]
+HISTORY_COLUMNS = [getattr(BMIRecord, field) for field in HISTORY_FIELDS]
+
 @router.post("/", response_model=BMIRecordSchema, status_code=status.HTTP_201_CREATED)
 async def create_bmi_record(
     bmi_data: BMIRecordCreate,
@@ -23,25 +32,30 @@ async def create_bmi_record(
             detail="Not authorized to create records for other users"
         )
     
-    # Create BMI record
+    # Create BMI record; BMI and category are always computed here
+    bmi = compute_bmi(bmi_data.height, bmi_data.weight)
     db_bmi = BMIRecord(
         user_id=bmi_data.user_id,
         height=bmi_data.height,
         weight=bmi_data.weight,
-        bmi=bmi_data.bmi,
-        bmi_category=bmi_data.bmi_category,
+        bmi=bmi,
+        bmi_category=bmi_category(bmi),
         mode=bmi_data.mode
     )
     
-    db.add(db_bmi)
-    db.commit()
-    db.refresh(db_bmi)
+    with observe_stage("db_commit"):
+        db.add(db_bmi)
+        bump_version(db, bmi_data.user_id, BMI)
+        db.commit()
+        db.refresh(db_bmi)
     
     return db_bmi
 
 @router.get("/{user_id}", response_model=List[BMIRecordSchema])
 async def get_bmi_history(
     user_id: int,
+    request: Request,
+    format: Literal["rows", "columnar"] = Query("rows", description="`columnar` returns {field: [values]}"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -52,7 +66,67 @@ async def get_bmi_history(
             detail="Not authorized to view records for other users"
         )
     
-    # Get BMI records
-    bmi_records = db.query(BMIRecord).filter(BMIRecord.user_id == user_id).order_by(BMIRecord.created_at.desc()).all()
+    # Answer 304 from the version counter before touching any history rows
+    not_modified, cache_headers = check_not_modified(request, db, user_id, BMI, variant=format)
+    if not_modified is not None:
+        return not_modified
+
+    # Get BMI records as plain column tuples; skips ORM objects and Pydantic
+    with observe_stage("db_query"):
+        rows = db.query(*HISTORY_COLUMNS).filter(BMIRecord.user_id == user_id).order_by(BMIRecord.created_at.desc()).all()
+    
+    with observe_stage("serialization"):
+        return FastJSONResponse(rows_to_content(HISTORY_FIELDS, rows, columnar=format == "columnar"), headers=cache_headers)
+
+@router.get("/{user_id}/trend", response_model=BMITrend)
+async def get_bmi_trend(
+    user_id: int,
+    request: Request,
+    bucket: Literal["day", "week"] = Query("week"),
+    window: int = Query(4, ge=1, le=52, description="Moving-average window, in buckets"),
+    horizon: int = Query(4, ge=0, le=52, description="Buckets to project ahead"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view records for other users"
+        )
+    
+    # Same version counter as the history, so any new record changes the ETag
+    not_modified, cache_headers = check_not_modified(
+        request, db, user_id, BMI, variant=f"trend-{bucket}-{window}-{horizon}"
+    )
+    if not_modified is not None:
+        return not_modified
+
+    with observe_stage("trend"):
+        trend = get_trend(db, user_id, bucket, window, horizon)
+    
+    with observe_stage("serialization"):
+        return FastJSONResponse(trend, headers=cache_headers)
+
+@router.delete("/records/{record_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_bmi_record(
+    record_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    db_bmi = db.query(BMIRecord).filter(BMIRecord.id == record_id).first()
+    if db_bmi is None:
+        raise HTTPException(status_code=404, detail="BMI record not found")
+    if db_bmi.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to delete records for other users"
+        )
+    
+    # Tombstone lets /sync report the deletion to other devices
+    with observe_stage("db_commit"):
+        db.delete(db_bmi)
+        record_deletion(db, current_user.id, BMI, record_id)
+        bump_version(db, current_user.id, BMI)
+        db.commit()
     
-    return bmi_records
\ No newline at end of file
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
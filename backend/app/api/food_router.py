@@ -1,8 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, File, UploadFile, Form, Query
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional
 import os
-import shutil
 from datetime import datetime
 
 from app.db.database import get_db
@@ -10,9 +9,23 @@ from app.models.food import FoodEntry
 from app.schemas.food import FoodEntry as FoodEntrySchema, FoodEntryCreate
 from app.core.security import get_current_user
 from app.models.user import User
+from app.core.metrics import observe_stage
+from app.core.responses import FastJSONResponse, rows_to_content
+from app.core.caching import FOODS, bump_version, check_not_modified
+from app.services.sync import record_deletion
+from app.services.side_effects import save_upload
+from fastapi.concurrency import run_in_threadpool
 
 router = APIRouter()
 
+# Columns returned by the history endpoint, in FoodEntrySchema field order
+HISTORY_FIELDS = [
+    "food_name", "mode", "calories", "protein", "carbs", "fat", "saturated_fat",
+    "fiber", "sugar", "cholesterol", "sodium", "calcium", "iron",
+    "id", "user_id", "image_path", "created_at",
+]
+HISTORY_COLUMNS = [getattr(FoodEntry, field) for field in HISTORY_FIELDS]
+
 # Create directory for food images if it doesn't exist
 UPLOAD_DIR = "uploads/food_images"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
@@ -51,8 +64,11 @@ async def create_food_entry(
         filename = f"{user_id}_{timestamp}_{image.filename}"
         image_path = os.path.join(UPLOAD_DIR, filename)
         
-        with open(image_path, "wb") as buffer:
-            shutil.copyfileobj(image.file, buffer)
+        # Write the file before the row exists, so no committed image_path
+        # ever points at a missing file
+        with observe_stage("upload"):
+            payload = await image.read()
+            await run_in_threadpool(save_upload, image_path, payload)
     
     # Create food entry
     db_food = FoodEntry(
@@ -73,15 +89,25 @@ async def create_food_entry(
         image_path=image_path
     )
     
-    db.add(db_food)
-    db.commit()
-    db.refresh(db_food)
+    with observe_stage("db_commit"):
+        try:
+            db.add(db_food)
+            bump_version(db, user_id, FOODS)
+            db.commit()
+        except Exception:
+            # No row references the file; don't leave it behind
+            if image_path is not None and os.path.exists(image_path):
+                os.remove(image_path)
+            raise
+        db.refresh(db_food)
     
     return db_food
 
 @router.get("/history/{user_id}", response_model=List[FoodEntrySchema])
 async def get_food_history(
     user_id: int,
+    request: Request,
+    format: Literal["rows", "columnar"] = Query("rows", description="`columnar` returns {field: [values]}"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -92,7 +118,38 @@ async def get_food_history(
             detail="Not authorized to view entries for other users"
         )
     
-    # Get food entries
-    food_entries = db.query(FoodEntry).filter(FoodEntry.user_id == user_id).order_by(FoodEntry.created_at.desc()).all()
+    # Answer 304 from the version counter before touching any history rows
+    not_modified, cache_headers = check_not_modified(request, db, user_id, FOODS, variant=format)
+    if not_modified is not None:
+        return not_modified
+
+    # Get food entries as plain column tuples; skips ORM objects and Pydantic
+    with observe_stage("db_query"):
+        rows = db.query(*HISTORY_COLUMNS).filter(FoodEntry.user_id == user_id).order_by(FoodEntry.created_at.desc()).all()
+    
+    with observe_stage("serialization"):
+        return FastJSONResponse(rows_to_content(HISTORY_FIELDS, rows, columnar=format == "columnar"), headers=cache_headers)
+
+@router.delete("/entries/{entry_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_food_entry(
+    entry_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    db_food = db.query(FoodEntry).filter(FoodEntry.id == entry_id).first()
+    if db_food is None:
+        raise HTTPException(status_code=404, detail="Food entry not found")
+    if db_food.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to delete entries for other users"
+        )
+    
+    # Tombstone lets /sync report the deletion to other devices
+    with observe_stage("db_commit"):
+        db.delete(db_food)
+        record_deletion(db, current_user.id, FOODS, entry_id)
+        bump_version(db, current_user.id, FOODS)
+        db.commit()
     
-    return food_entries
\ No newline at end of file
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
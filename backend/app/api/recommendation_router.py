@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.db.database import get_db
+from app.core.security import get_current_user
+from app.models.user import User
+from app.core.metrics import observe_stage
+from app.schemas.recommendation import RecommendationResponse
+from app.services.recommendations import recommend
+
+router = APIRouter()
+
+@router.get("/recommendations/{user_id}", response_model=RecommendationResponse)
+async def get_recommendations(
+    user_id: int,
+    k: int = Query(5, ge=1, le=50),
+    exclude: bool = Query(True, description="Drop foods heavy in nutrients limited for the user's diseases"),
+    utc_offset: int = Query(0, ge=-14 * 60, le=14 * 60, description="Client UTC offset in minutes; sets when 'today' starts"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view recommendations for other users"
+        )
+
+    with observe_stage("recommend"):
+        return recommend(db, current_user, k=k, exclude=exclude, utc_offset_minutes=utc_offset)
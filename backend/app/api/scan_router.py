@@ -0,0 +1,129 @@
+from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
+from sqlalchemy.orm import Session
+import logging
+import os
+import uuid
+from datetime import datetime
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.db.database import get_db
+from app.models.food import FoodEntry
+from app.schemas.scan import ScanResult
+from app.schemas.food import FoodEntry as FoodEntrySchema
+from app.core.security import get_current_user
+from app.models.user import User
+from app.api.food_router import UPLOAD_DIR
+from app.services import recognition
+from app.services.nutrition import nutrition_for
+from app.services.side_effects import save_upload
+from app.core.metrics import SCAN_OUTCOMES, observe_stage
+from app.core.caching import FOODS, bump_version
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def _log_food(db: Session, user_id: int, label: str, mode: str, image_path: str) -> FoodEntry:
+    db_food = FoodEntry(
+        user_id=user_id,
+        food_name=label,
+        mode=mode,
+        image_path=image_path,
+        **nutrition_for(label)
+    )
+    with observe_stage("db_commit"):
+        db.add(db_food)
+        bump_version(db, user_id, FOODS)
+        db.commit()
+        db.refresh(db_food)
+    return db_food
+
+
+@router.post("/scan", response_model=ScanResult)
+async def scan_and_log(
+    user_id: int = Form(...),
+    mode: str = Form("swasthya"),
+    image: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Recognise a food photo and, if confident, log it in the same request."""
+    if user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to create entries for other users"
+        )
+
+    with observe_stage("upload"):
+        payload = await image.read()
+
+    # Save image once; an uncertain scan is confirmed later by path, not re-uploaded.
+    # The random part keeps two scans in the same second from sharing a file.
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"{user_id}_{timestamp}_{uuid.uuid4().hex[:8]}_{os.path.basename(image.filename or 'scan.jpg')}"
+    image_path = os.path.join(UPLOAD_DIR, filename)
+    with observe_stage("upload"):
+        await run_in_threadpool(save_upload, image_path, payload)
+
+    # Inference runs in the scan executor, never on the event loop
+    try:
+        with observe_stage("inference"):
+            prediction = await recognition.classify(payload)
+    except recognition.InvalidImage:
+        # Nothing can confirm a scan that failed; don't keep its image
+        await run_in_threadpool(os.remove, image_path)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Could not read the uploaded image"
+        )
+    except Exception:
+        logger.exception("Food recognition failed")
+        await run_in_threadpool(os.remove, image_path)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Food recognition unavailable"
+        )
+
+    SCAN_OUTCOMES.labels(prediction["status"]).inc()
+    if prediction["status"] != "confident":
+        return ScanResult(status="uncertain", options=prediction["options"], image_path=image_path)
+
+    label = prediction["predicted_label"]
+    db_food = _log_food(db, user_id, label, mode, image_path)
+    return ScanResult(
+        status="confident",
+        predicted_label=label,
+        confidence=prediction["confidence"],
+        nutrition=nutrition_for(label),
+        image_path=image_path,
+        entry=FoodEntrySchema.from_orm(db_food),
+    )
+
+
+@router.post("/scan/confirm", response_model=FoodEntrySchema, status_code=status.HTTP_201_CREATED)
+async def confirm_scan(
+    user_id: int = Form(...),
+    food_name: str = Form(...),
+    image_path: str = Form(...),
+    mode: str = Form("swasthya"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Log an uncertain scan with the label the user picked, reusing the stored image."""
+    if user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to create entries for other users"
+        )
+
+    # Only accept images this user uploaded through /foods/scan
+    expected_prefix = os.path.join(UPLOAD_DIR, f"{user_id}_")
+    if os.path.normpath(image_path) != image_path or not image_path.startswith(expected_prefix) \
+            or not os.path.exists(image_path):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unknown image_path"
+        )
+
+    return _log_food(db, user_id, food_name, mode, image_path)
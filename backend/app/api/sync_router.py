@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.db.database import get_db
+from app.schemas.sync import SyncResponse
+from app.core.security import get_current_user
+from app.models.user import User
+from app.core.metrics import observe_stage
+from app.core.responses import FastJSONResponse
+from app.services.sync import changes_since, decode_cursor
+
+router = APIRouter()
+
+@router.get("/", response_model=SyncResponse)
+async def sync_changes(
+    since: Optional[str] = Query(None, description="Cursor from the previous sync; omit for a full sync"),
+    limit: int = Query(500, ge=1, le=5000, description="Maximum rows per collection"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Food entries, BMI records, deletions and profile changes after `since`."""
+    positions = None
+    if since:
+        try:
+            positions = decode_cursor(since)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid sync cursor"
+            )
+
+    with observe_stage("db_query"):
+        changes = changes_since(db, current_user, positions, limit)
+
+    with observe_stage("serialization"):
+        return FastJSONResponse(changes)
@@ -0,0 +1,75 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request, Response, status
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from app.models.version import UserDataVersion
+
+FOODS = "foods"
+BMI = "bmi"
+
+
+def bump_version(db: Session, user_id: int, collection: str) -> None:
+    """Increment the user's version for `collection`; commit with the write it tracks."""
+    now = datetime.utcnow()
+    # Atomic upsert: concurrent writers can't both read N and write N + 1
+    stmt = insert(UserDataVersion).values(user_id=user_id, collection=collection, version=1, updated_at=now)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserDataVersion.user_id, UserDataVersion.collection],
+        set_={"version": UserDataVersion.version + 1, "updated_at": now},
+    )
+    db.execute(stmt)
+
+
+def get_version(db: Session, user_id: int, collection: str) -> Tuple[int, Optional[datetime]]:
+    row = db.query(UserDataVersion.version, UserDataVersion.updated_at).filter(
+        UserDataVersion.user_id == user_id, UserDataVersion.collection == collection
+    ).first()
+    # No row yet: nothing has been written since versioning started
+    return (row.version, row.updated_at) if row else (0, None)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison: ignore W/ prefixes on either side
+    return any(tag.strip().removeprefix("W/") == etag.removeprefix("W/") for tag in header.split(","))
+
+
+def check_not_modified(
+    request: Request, db: Session, user_id: int, collection: str, variant: str = ""
+) -> Tuple[Optional[Response], Dict[str, str]]:
+    """Validate conditional headers against the user's version counter.
+
+    Returns (304 response or None, validator headers for the full response).
+    Runs a single primary-key lookup, so it must come before the history query.
+    """
+    version, updated_at = get_version(db, user_id, collection)
+    etag = f'W/"{collection}-{user_id}-{version}{"-" + variant if variant else ""}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if updated_at is not None:
+        headers["Last-Modified"] = format_datetime(updated_at.replace(tzinfo=timezone.utc), usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers), headers
+        return None, headers
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and updated_at is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            since = None
+        # "-0000" dates parse as naive datetimes; HTTP dates are always UTC
+        if since is not None and since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have whole-second resolution
+        if since is not None and updated_at.replace(tzinfo=timezone.utc, microsecond=0) <= since:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers), headers
+
+    return None, headers
@@ -0,0 +1,38 @@
+import os
+
+# Repository root (backend/app/core/config.py -> repo)
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# Food recognition service (backend-ml) used in-process by the scan router
+ML_DIR = os.getenv("BHOJANBUDDY_ML_DIR", os.path.join(ROOT_DIR, "backend-ml"))
+NUTRITION_DB_PATH = os.path.join(ML_DIR, "model", "nutrition_db.json")
+# Daily nutrient targets per disease and age group, used by recommendations
+NUTRIENT_TARGETS_PATH = os.getenv(
+    "BHOJANBUDDY_NUTRIENT_TARGETS", os.path.join(ROOT_DIR, "nutrient_targets_disease_age.csv")
+)
+
+# Mount /foods/scan (needs the backend-ml requirements installed)
+SCAN_ENABLED = os.getenv("BHOJANBUDDY_ENABLE_SCAN", "0") == "1"
+# "thread": run the model in this process; "process": run it in a local worker pool
+SCAN_POOL = os.getenv("BHOJANBUDDY_SCAN_POOL", "thread")
+SCAN_WORKERS = int(os.getenv("BHOJANBUDDY_SCAN_WORKERS", "1"))
+
+# Background task queue for post-commit side effects
+TASK_WORKERS = int(os.getenv("BHOJANBUDDY_TASK_WORKERS", "2"))
+TASK_QUEUE_SIZE = int(os.getenv("BHOJANBUDDY_TASK_QUEUE_SIZE", "1000"))
+TASK_MAX_RETRIES = int(os.getenv("BHOJANBUDDY_TASK_MAX_RETRIES", "3"))
+# Set to a SQLite file to persist queued tasks across restarts
+TASKS_DB_PATH = os.getenv("BHOJANBUDDY_TASKS_DB") or None
+
+# Token-bucket rate limits per route class, as "<requests>/<second|minute|hour|day>" or "off"
+RATE_LIMIT_ENABLED = os.getenv("BHOJANBUDDY_RATE_LIMIT", "1") == "1"
+RATE_LIMITS = {
+    "inference": os.getenv("BHOJANBUDDY_RATE_LIMIT_INFERENCE", "30/minute"),
+    "auth": os.getenv("BHOJANBUDDY_RATE_LIMIT_AUTH", "10/minute"),
+    "writes": os.getenv("BHOJANBUDDY_RATE_LIMIT_WRITES", "120/minute"),
+    "reads": os.getenv("BHOJANBUDDY_RATE_LIMIT_READS", "600/minute"),
+}
+# Set to a SQLite file to share buckets between worker processes
+RATE_LIMIT_STORE = os.getenv("BHOJANBUDDY_RATE_LIMIT_STORE") or None
+# Key clients by the first X-Forwarded-For address (only behind a trusted proxy)
+TRUST_FORWARDED_FOR = os.getenv("BHOJANBUDDY_TRUST_FORWARDED_FOR", "0") == "1"
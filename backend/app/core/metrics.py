@@ -0,0 +1,81 @@
+import os
+import time
+
+from fastapi import Request, Response
+import fastapi.routing
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+STAGE_SECONDS = Histogram(
+    "bhojanbuddy_api_stage_seconds",
+    "Time spent in each request stage",
+    # jwt_decode, user_lookup, db_query, db_commit, upload, inference, serialization
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+REQUEST_SECONDS = Histogram(
+    "bhojanbuddy_api_request_seconds",
+    "End-to-end request latency",
+    ["route", "method", "status"],
+    buckets=STAGE_BUCKETS,
+)
+SCAN_OUTCOMES = Counter(
+    "bhojanbuddy_api_scan_total",
+    "/foods/scan predictions by outcome",
+    ["status"],  # confident, uncertain
+)
+RATE_LIMITED = Counter(
+    "bhojanbuddy_api_rate_limited_total",
+    "Requests rejected with 429 by the rate limiter",
+    ["route_class"],  # inference, auth, writes, reads
+)
+
+
+def observe_stage(stage):
+    """Context manager timing one stage: `with observe_stage("db_query"): ...`"""
+    return STAGE_SECONDS.labels(stage).time()
+
+
+async def metrics_middleware(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    # Label by route template, not raw path, to keep label cardinality bounded
+    if route is not None and route.path != "/metrics":
+        REQUEST_SECONDS.labels(route.path, request.method, response.status_code).observe(
+            time.perf_counter() - started
+        )
+    return response
+
+
+_serialize_response = fastapi.routing.serialize_response
+
+
+async def _timed_serialize_response(*args, **kwargs):
+    with observe_stage("serialization"):
+        return await _serialize_response(*args, **kwargs)
+
+
+def instrument_serialization():
+    # FastAPI validates and encodes response_model output in this module-level
+    # function; wrapping it is the only way to time serialization for every route
+    fastapi.routing.serialize_response = _timed_serialize_response
+
+
+def metrics_response():
+    """Prometheus text exposition for this process, or all workers in multiprocess mode."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,47 @@
+import cProfile
+import os
+import time
+import uuid
+
+from fastapi import Request
+
+# Profile a request when profiling is switched on and it carries `X-Profile: 1`
+PROFILING_ENABLED = os.getenv("BHOJANBUDDY_PROFILING", "0") == "1"
+PROFILE_DIR = os.getenv("BHOJANBUDDY_PROFILE_DIR", "profiles")
+
+try:
+    # Sampling profiler that follows async tasks across awaits
+    from pyinstrument import Profiler
+except ImportError:
+    Profiler = None
+
+
+def _report_path(path, suffix):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    name = path.strip("/").replace("/", "_") or "root"
+    return os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d_%H%M%S')}_{name}_{uuid.uuid4().hex[:6]}{suffix}")
+
+
+async def profiling_middleware(request: Request, call_next):
+    if not (PROFILING_ENABLED and request.headers.get("X-Profile") == "1"):
+        return await call_next(request)
+
+    if Profiler is not None:
+        profiler = Profiler(async_mode="enabled")
+        profiler.start()
+        response = await call_next(request)
+        profiler.stop()
+        report = _report_path(request.url.path, ".html")
+        with open(report, "w") as f:
+            f.write(profiler.output_html())
+    else:
+        # cProfile only sees this coroutine's thread; sync endpoints in the threadpool are missed
+        profiler = cProfile.Profile()
+        profiler.enable()
+        response = await call_next(request)
+        profiler.disable()
+        report = _report_path(request.url.path, ".prof")
+        profiler.dump_stats(report)
+
+    response.headers["X-Profile-File"] = report
+    return response
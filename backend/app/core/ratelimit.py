@@ -0,0 +1,212 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+from jose import JWTError, jwt
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import RATE_LIMITS, RATE_LIMIT_ENABLED, RATE_LIMIT_STORE, TRUST_FORWARDED_FOR
+from app.core.metrics import RATE_LIMITED
+from app.core.security import ALGORITHM, SECRET_KEY
+
+# Route classes, cheapest last
+INFERENCE = "inference"
+AUTH = "auth"
+WRITES = "writes"
+READS = "reads"
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# Never limited: monitoring and the API docs
+EXEMPT_PATHS = ("/metrics", "/docs", "/redoc", "/openapi.json")
+
+
+def parse_limit(spec: str) -> Optional[Tuple[float, float]]:
+    """Parse "30/minute" into (capacity, refill per second); "off" disables the class.
+
+    Raises ValueError for anything else, so a bad setting fails at startup.
+    """
+    if spec.strip().lower() in ("", "off", "0"):
+        return None
+    count, _, period = spec.partition("/")
+    period = period.strip().lower() or "second"
+    if period not in PERIODS:
+        raise ValueError(f"Rate limit {spec!r}: period must be one of {', '.join(PERIODS)}")
+    try:
+        capacity = float(count)
+    except ValueError:
+        raise ValueError(f"Rate limit {spec!r}: expected a count such as '30/minute'") from None
+    # A bucket smaller than one token would reject every request
+    if not 1 <= capacity < math.inf:
+        raise ValueError(f"Rate limit {spec!r}: count must be at least 1; use 'off' to disable")
+    return capacity, capacity / PERIODS[period]
+
+
+class MemoryStore:
+    """Token buckets in this process; each worker limits independently."""
+
+    blocking = False
+
+    def __init__(self, max_keys: int = 100_000):
+        # key -> (tokens, updated, time the bucket is full again)
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+        self.max_keys = max_keys
+
+    def take(self, key: str, capacity: float, rate: float, now: float) -> float:
+        """Take one token; returns 0 if allowed, else seconds until one is available."""
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(key, (capacity, now, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if wait == 0:
+                tokens -= 1
+            self._buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+            if len(self._buckets) > self.max_keys:
+                self._evict(now)
+            return wait
+
+    def _evict(self, now):
+        # A bucket that has refilled completely is the same as no bucket
+        for key in [k for k, (_, _, full_at) in self._buckets.items() if full_at <= now]:
+            del self._buckets[key]
+
+
+class SQLiteStore:
+    """Token buckets in a SQLite file shared by every worker on the host."""
+
+    blocking = True
+    # Delete refilled buckets every this many calls per thread
+    prune_every = 1000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        # Short-lived connection: this may run in a pre-fork master, and
+        # SQLite connections must not cross fork()
+        conn = sqlite3.connect(path, timeout=5)
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, full_at REAL NOT NULL)"
+            )
+        conn.close()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.calls = 0
+        return conn
+
+    def take(self, key: str, capacity: float, rate: float, now: float) -> float:
+        conn = self._connect()
+        # IMMEDIATE takes the write lock up front, so read-modify-write is atomic
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM rate_limits WHERE key = ?", (key,)).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if wait == 0:
+                tokens -= 1
+            conn.execute(
+                "INSERT INTO rate_limits (key, tokens, updated, full_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated, "
+                "full_at = excluded.full_at",
+                (key, tokens, now, now + (capacity - tokens) / rate),
+            )
+            self._local.calls += 1
+            if self._local.calls % self.prune_every == 0:
+                conn.execute("DELETE FROM rate_limits WHERE full_at <= ?", (now,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+
+def route_class(method: str, path: str) -> Optional[str]:
+    # CORS preflights are answered without touching any handler
+    if method == "OPTIONS" or path == "/" or path.startswith(EXEMPT_PATHS):
+        return None
+    if path.startswith("/auth/"):
+        return AUTH
+    if path.startswith("/foods/scan") and not path.startswith("/foods/scan/confirm"):
+        return INFERENCE
+    if method in ("GET", "HEAD"):
+        return READS
+    return WRITES
+
+
+def client_key(request: Request, limit_class: str) -> str:
+    """Verified token subject when there is one, otherwise the client IP."""
+    # Auth routes are keyed by IP: that's what a password-guessing client controls
+    if limit_class != AUTH:
+        header = request.headers.get("authorization", "")
+        if header.lower().startswith("bearer "):
+            try:
+                # Verified decode, so a forged token can't drain someone else's bucket
+                sub = jwt.decode(header[7:], SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+            except JWTError:
+                sub = None
+            if sub:
+                return f"user:{sub}"
+    # Same rule as backend-ml: only trust X-Forwarded-For behind a proxy that sets it
+    forwarded = request.headers.get("x-forwarded-for")
+    if TRUST_FORWARDED_FOR and forwarded:
+        return "ip:" + forwarded.split(",")[0].strip()
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+class RateLimiter:
+    def __init__(self, limits: Dict[str, str], store=None):
+        self.limits = {name: parse_limit(spec) for name, spec in limits.items()}
+        self.store = store or MemoryStore()
+
+    def check(self, limit_class: str, key: str) -> float:
+        """Seconds the caller must wait (0 when the request may proceed)."""
+        limit = self.limits.get(limit_class)
+        if limit is None:
+            return 0.0
+        capacity, rate = limit
+        return self.store.take(f"{limit_class}:{key}", capacity, rate, time.time())
+
+
+def _default_store():
+    if RATE_LIMIT_STORE:
+        os.makedirs(os.path.dirname(os.path.abspath(RATE_LIMIT_STORE)), exist_ok=True)
+        return SQLiteStore(RATE_LIMIT_STORE)
+    return MemoryStore()
+
+
+rate_limiter = RateLimiter(RATE_LIMITS, _default_store()) if RATE_LIMIT_ENABLED else None
+
+
+async def rate_limit_middleware(request: Request, call_next):
+    limit_class = route_class(request.method, request.url.path)
+    if rate_limiter is None or limit_class is None:
+        return await call_next(request)
+
+    key = client_key(request, limit_class)
+    if rate_limiter.store.blocking:
+        wait = await run_in_threadpool(rate_limiter.check, limit_class, key)
+    else:
+        wait = rate_limiter.check(limit_class, key)
+    if wait > 0:
+        # Rejected before routing: no body parsing, bcrypt or model work
+        RATE_LIMITED.labels(limit_class).inc()
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={"detail": "Too many requests"},
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
+    return await call_next(request)
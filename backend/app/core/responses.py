@@ -0,0 +1,43 @@
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Sequence
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson when available (stdlib json otherwise).
+
+    Content is expected to be plain dicts/lists of primitives, datetimes and
+    enums; unlike the default response nothing is run through Pydantic.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(content, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def rows_to_content(fields: Sequence[str], rows: Sequence[tuple], columnar: bool = False):
+    """Shape column tuples as a list of objects, or as {"columns": {field: [...]}}.
+
+    The columnar form sends each field name once instead of once per row.
+    """
+    if columnar:
+        columns = list(zip(*rows)) if rows else [()] * len(fields)
+        return {"count": len(rows), "columns": {field: list(col) for field, col in zip(fields, columns)}}
+    return [dict(zip(fields, row)) for row in rows]
@@ -0,0 +1,181 @@
+import asyncio
+import base64
+import json
+import logging
+import sqlite3
+import threading
+from typing import Callable, Dict, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import TASK_MAX_RETRIES, TASK_QUEUE_SIZE, TASK_WORKERS, TASKS_DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# Registered task functions by name; durable mode stores the name, not the function
+_registry: Dict[str, Callable] = {}
+
+
+def background_task(func: Callable) -> Callable:
+    """Register `func` so it can be enqueued (and restored from the durable store)."""
+    _registry[f"{func.__module__}.{func.__qualname__}"] = func
+    func.task_name = f"{func.__module__}.{func.__qualname__}"
+    return func
+
+
+def _encode(value):
+    if isinstance(value, bytes):
+        return {"__bytes__": base64.b64encode(value).decode()}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode(obj):
+    if "__bytes__" in obj:
+        return base64.b64decode(obj["__bytes__"])
+    return obj
+
+
+class _DurableStore:
+    """Pending tasks in a small SQLite file, so a restart doesn't lose them."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                "id INTEGER PRIMARY KEY, name TEXT NOT NULL, payload TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, failed INTEGER NOT NULL DEFAULT 0)"
+            )
+
+    def add(self, name: str, args, kwargs) -> int:
+        payload = json.dumps({"args": args, "kwargs": kwargs}, default=_encode)
+        with self._lock, self._conn:
+            return self._conn.execute("INSERT INTO tasks (name, payload) VALUES (?, ?)", (name, payload)).lastrowid
+
+    def pending(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT id, name, payload FROM tasks WHERE failed = 0 ORDER BY id").fetchall()
+        for task_id, name, payload in rows:
+            data = json.loads(payload, object_hook=_decode)
+            yield task_id, name, data["args"], data["kwargs"]
+
+    def done(self, task_id: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    def failed(self, task_id: int, attempts: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE tasks SET failed = 1, attempts = ? WHERE id = ?", (attempts, task_id))
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class TaskQueue:
+    """Bounded in-process queue that runs side effects after the response.
+
+    Sync functions run in the threadpool so they never block the event loop.
+    A failing task is retried with exponential backoff up to `max_retries`
+    times. When the queue is full, `enqueue` runs the task inline instead of
+    dropping it, which applies backpressure to the caller.
+    """
+
+    def __init__(self, workers: int = 2, maxsize: int = 1000, max_retries: int = 3,
+                 retry_delay: float = 0.5, durable_path: Optional[str] = None):
+        self.workers = workers
+        self.maxsize = maxsize
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.durable_path = durable_path
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self._store: Optional[_DurableStore] = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        # Workers first: replaying more pending tasks than maxsize would
+        # otherwise block on put() forever
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        if self.durable_path:
+            self._store = _DurableStore(self.durable_path)
+            # Resume whatever was still queued when the last process stopped
+            for task_id, name, args, kwargs in list(self._store.pending()):
+                await self._queue.put((task_id, name, args, kwargs))
+
+    async def stop(self, drain: bool = True) -> None:
+        if not self.running:
+            return
+        if drain:
+            await self.drain()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    async def drain(self) -> None:
+        """Wait until every queued task has finished (tests use this for determinism)."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def enqueue(self, func: Callable, *args, **kwargs) -> None:
+        name = getattr(func, "task_name", None)
+        if name is None:
+            raise ValueError(f"{func!r} is not registered with @background_task")
+
+        if not self.running or self._queue.full():
+            # Not started (e.g. scripts) or saturated: do the work now
+            await self._run_with_retries(name, args, kwargs)
+            return
+
+        task_id = self._store.add(name, list(args), kwargs) if self._store is not None else None
+        self._queue.put_nowait((task_id, name, args, kwargs))
+
+    async def _worker(self) -> None:
+        while True:
+            task_id, name, args, kwargs = await self._queue.get()
+            try:
+                ok, attempts = await self._run_with_retries(name, args, kwargs)
+                if self._store is not None and task_id is not None:
+                    if ok:
+                        self._store.done(task_id)
+                    else:
+                        self._store.failed(task_id, attempts)
+            finally:
+                self._queue.task_done()
+
+    async def _run_with_retries(self, name, args, kwargs):
+        func = _registry.get(name)
+        if func is None:
+            logger.error("Unknown background task %s", name)
+            return False, 0
+        for attempt in range(1, self.max_retries + 2):
+            try:
+                if asyncio.iscoroutinefunction(func):
+                    await func(*args, **kwargs)
+                else:
+                    await run_in_threadpool(func, *args, **kwargs)
+                return True, attempt
+            except Exception:
+                if attempt > self.max_retries:
+                    logger.exception("Background task %s failed after %d attempts", name, attempt)
+                    return False, attempt
+                await asyncio.sleep(self.retry_delay * 2 ** (attempt - 1))
+        return False, self.max_retries + 1
+
+
+task_queue = TaskQueue(
+    workers=TASK_WORKERS,
+    maxsize=TASK_QUEUE_SIZE,
+    max_retries=TASK_MAX_RETRIES,
+    durable_path=TASKS_DB_PATH,
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -16,6 +16,12 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create Base class
 Base = declarative_base()
 
+# Millisecond UTC timestamp computed by SQLite inside the writing statement.
+# SQLite allows one writer at a time, so these values follow commit order,
+# which is what makes `updated_at > cursor` a safe sync query.
+def utc_now_ms():
+    return func.strftime("%Y-%m-%d %H:%M:%f", "now")
+
 # Function to get database session
 def get_db():
     db = SessionLocal()
@@ -24,6 +30,8 @@ def get_db():
     finally:
         db.close()
 
-# Function to create tables
+# Create or upgrade the schema (see app/db/migrations.py)
 def create_tables():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    from app.db.migrations import migrate
+
+    migrate(engine)
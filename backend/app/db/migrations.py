@@ -0,0 +1,119 @@
+"""Versioned schema migrations for the SQLite database.
+
+The schema version lives in SQLite's `PRAGMA user_version`. On startup,
+`migrate()` either creates a fresh database from the models and stamps it
+with the latest version, or runs each pending migration in its own
+transaction and bumps the version with it. Migrations have to be safe on a
+database that already has some of their changes, because databases created
+before versioning start at version 0.
+
+To change the schema, update the model and append a migration to MIGRATIONS;
+never edit or reorder the ones that have shipped.
+"""
+from contextlib import contextmanager
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.database import Base, engine as default_engine
+# Register every model on Base.metadata
+from app.models import bmi, food, tombstone, user, version  # noqa: F401
+
+
+def _columns(conn: Connection, table: str) -> set:
+    return {column["name"] for column in inspect(conn).get_columns(table)}
+
+
+def _create_tables(*tables):
+    def run(conn: Connection):
+        for table in tables:
+            table.create(conn, checkfirst=True)
+    return run
+
+
+def _add_user_diseases(conn: Connection):
+    # Early databases predate the profile's disease list
+    if "diseases" not in _columns(conn, "users"):
+        conn.execute(text("ALTER TABLE users ADD COLUMN diseases JSON"))
+
+
+def _add_updated_at(conn: Connection):
+    for table in ("food_entries", "bmi_records"):
+        if "updated_at" not in _columns(conn, table):
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN updated_at DATETIME"))
+            conn.execute(text(f"UPDATE {table} SET updated_at = created_at"))
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_user_id_updated_at ON {table} (user_id, updated_at)"
+        ))
+
+
+def _add_history_indexes(conn: Connection):
+    # History, trend and today's-intake queries filter by user and order or
+    # range over created_at; without these they scan the whole table
+    for table in ("food_entries", "bmi_records"):
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_user_id_created_at ON {table} (user_id, created_at)"
+        ))
+    conn.execute(text("ANALYZE"))
+
+
+def _normalize_change_times(conn: Connection):
+    # Sync compares these columns as text; the backfill in migration 3 copied
+    # created_at at second resolution, while writes store utc_now_ms()
+    for table, column in (("food_entries", "updated_at"), ("bmi_records", "updated_at"), ("tombstones", "deleted_at")):
+        conn.execute(text(
+            f"UPDATE {table} SET {column} = strftime('%Y-%m-%d %H:%M:%f', {column}) "
+            f"WHERE {column} IS NOT NULL AND {column} != strftime('%Y-%m-%d %H:%M:%f', {column})"
+        ))
+
+
+# (version, description, function); versions are consecutive from 1
+MIGRATIONS = [
+    (1, "version and tombstone tables", _create_tables(version.UserDataVersion.__table__, tombstone.Tombstone.__table__)),
+    (2, "diseases on users", _add_user_diseases),
+    (3, "updated_at on food_entries and bmi_records", _add_updated_at),
+    (4, "(user_id, created_at) indexes", _add_history_indexes),
+    (5, "millisecond text for sync timestamps", _normalize_change_times),
+]
+LATEST = MIGRATIONS[-1][0]
+
+
+def current_version(conn: Connection) -> int:
+    return conn.execute(text("PRAGMA user_version")).scalar()
+
+
+@contextmanager
+def _exclusive(engine: Engine):
+    """Connection inside BEGIN IMMEDIATE, so DDL is transactional too and
+    workers starting together migrate one at a time."""
+    with engine.connect() as conn:
+        # pysqlite only opens transactions before DML; start one explicitly
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
+def migrate(engine: Engine = default_engine) -> int:
+    """Bring the database to LATEST; returns the number of migrations applied."""
+    with _exclusive(engine) as conn:
+        if not inspect(conn).has_table("users"):
+            # Fresh database: the models already describe the latest schema
+            Base.metadata.create_all(conn)
+            conn.execute(text(f"PRAGMA user_version = {LATEST}"))
+            return 0
+
+    applied = 0
+    for number, description, run in MIGRATIONS:
+        # One transaction per migration; user_version is rolled back with it
+        with _exclusive(engine) as conn:
+            if current_version(conn) >= number:
+                continue
+            print(f"Applying migration {number}: {description}")
+            run(conn)
+            conn.execute(text(f"PRAGMA user_version = {number}"))
+            applied += 1
+    return applied
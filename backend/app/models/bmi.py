@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from app.db.database import Base
+from app.db.database import Base, utc_now_ms
 from app.models.user import ModeType
 
 class BMIRecord(Base):
@@ -15,6 +15,13 @@ class BMIRecord(Base):
     bmi_category = Column(String)
     mode = Column(Enum(ModeType), default=ModeType.SWASTHYA)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set on insert and every update; drives /sync
+    updated_at = Column(DateTime, default=utc_now_ms(), onupdate=utc_now_ms())
     
     # Relationship with User
-    user = relationship("User", backref="bmi_records")
\ No newline at end of file
+    user = relationship("User", backref="bmi_records")
+
+    __table_args__ = (
+        Index("ix_bmi_records_user_id_updated_at", "user_id", "updated_at"),
+        Index("ix_bmi_records_user_id_created_at", "user_id", "created_at"),
+    )
\ No newline at end of file
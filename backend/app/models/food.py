@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from app.db.database import Base
+from app.db.database import Base, utc_now_ms
 from app.models.user import ModeType
 
 class FoodEntry(Base):
@@ -29,6 +29,13 @@ class FoodEntry(Base):
     iron = Column(Float, nullable=True)           # mg
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set on insert and every update; drives /sync
+    updated_at = Column(DateTime, default=utc_now_ms(), onupdate=utc_now_ms())
     
     # Relationship with User
-    user = relationship("User", backref="food_entries")
\ No newline at end of file
+    user = relationship("User", backref="food_entries")
+
+    __table_args__ = (
+        Index("ix_food_entries_user_id_updated_at", "user_id", "updated_at"),
+        Index("ix_food_entries_user_id_created_at", "user_id", "created_at"),
+    )
\ No newline at end of file
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from app.db.database import Base, utc_now_ms
+
+class Tombstone(Base):
+    """Marker left behind when a record is deleted, so /sync can report it."""
+    __tablename__ = "tombstones"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    collection = Column(String, nullable=False)  # "foods" or "bmi"
+    record_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, nullable=False, default=utc_now_ms())
+
+    __table_args__ = (
+        Index("ix_tombstones_user_id_deleted_at", "user_id", "deleted_at"),
+    )
@@ -1,7 +1,7 @@
 from sqlalchemy import Column, Integer, String, Float, DateTime, Enum, JSON
 from sqlalchemy.sql import func
 import enum
-from app.db.database import Base
+from app.db.database import Base, utc_now_ms
 
 class ModeType(str, enum.Enum):
     BEAST = "beast"
@@ -21,4 +21,4 @@ class User(Base):
     preferred_mode = Column(Enum(ModeType), default=ModeType.SWASTHYA, nullable=True)
     diseases = Column(JSON, nullable=True)  # Store diseases as JSON array
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=utc_now_ms())
\ No newline at end of file
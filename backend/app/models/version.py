@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from app.db.database import Base
+
+class UserDataVersion(Base):
+    """Per-user change counter for one collection ("foods", "bmi").
+
+    Bumped in the same transaction as every write to that collection, so
+    (user_id, collection, version) identifies the exact history contents.
+    """
+    __tablename__ = "user_data_versions"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    collection = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)
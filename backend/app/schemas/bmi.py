@@ -1,24 +1,55 @@
-from pydantic import BaseModel
-from typing import Optional, Literal
+from pydantic import BaseModel, Field
+from typing import Optional, Literal, List, Dict
 from datetime import datetime
 
 class BMIRecordBase(BaseModel):
-    height: float
-    weight: float
+    height: float  # in cm
+    weight: float  # in kg
     bmi: float
     bmi_category: str
     mode: Literal["beast", "swasthya"] = "swasthya"
 
 class BMIRecordCreate(BMIRecordBase):
+    height: float = Field(..., gt=0)
+    weight: float = Field(..., gt=0)
+    # Computed by the server from height and weight; client values are ignored
+    bmi: Optional[float] = None
+    bmi_category: Optional[str] = None
     user_id: int
 
 class BMIRecordInDB(BMIRecordBase):
     id: int
     user_id: int
     created_at: datetime
+    updated_at: Optional[datetime] = None
     
     class Config:
         orm_mode = True
 
 class BMIRecord(BMIRecordInDB):
-    pass
\ No newline at end of file
+    pass
+
+class BMITrendPoint(BaseModel):
+    start: str  # first day of the bucket, YYYY-MM-DD
+    records: int
+    weight: Optional[float] = None
+    bmi: Optional[float] = None
+    weight_avg: Optional[float] = None
+    bmi_avg: Optional[float] = None
+    # Change of the moving average per bucket
+    weight_rate: Optional[float] = None
+    bmi_rate: Optional[float] = None
+
+class BMIProjection(BaseModel):
+    start: str
+    weight: Optional[float] = None
+    bmi: Optional[float] = None
+
+class BMITrend(BaseModel):
+    user_id: int
+    bucket: Literal["day", "week"]
+    window: int
+    points: List[BMITrendPoint] = []
+    # Per-bucket slope of the linear fit used for the projection
+    slope: Dict[str, Optional[float]] = {}
+    projection: List[BMIProjection] = []
@@ -29,6 +29,7 @@ class FoodEntryInDB(FoodEntryBase):
     user_id: int
     image_path: Optional[str] = None
     created_at: datetime
+    updated_at: Optional[datetime] = None
     
     class Config:
         orm_mode = True
@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import List, Dict
+
+
+class Recommendation(BaseModel):
+    food_name: str
+    score: float
+    # Per serving (100 g)
+    nutrition: Dict[str, float]
+
+
+class RecommendationResponse(BaseModel):
+    # Diseases matched to the targets table; empty means default targets
+    diseases: List[str] = []
+    age_group: str
+    targets: Dict[str, float]
+    consumed: Dict[str, float]
+    remaining: Dict[str, float]
+    # Meals the remaining budget is split across
+    meals_left: int = 1
+    # Foods dropped by disease exclusions
+    excluded: int = 0
+    recommendations: List[Recommendation] = []
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import Optional, List, Dict
+
+from app.schemas.food import FoodEntry
+
+
+class ScanOption(BaseModel):
+    label: str
+    confidence: float
+
+
+class ScanResult(BaseModel):
+    status: str  # "confident" or "uncertain"
+    predicted_label: Optional[str] = None
+    confidence: Optional[float] = None
+    nutrition: Optional[Dict[str, Optional[float]]] = None
+    options: Optional[List[ScanOption]] = None
+    # Stored upload; pass it to /foods/scan/confirm instead of re-uploading
+    image_path: Optional[str] = None
+    # Logged entry (only when the prediction was confident)
+    entry: Optional[FoodEntry] = None
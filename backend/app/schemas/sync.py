@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Optional, List, Dict
+
+from app.schemas.food import FoodEntry
+from app.schemas.bmi import BMIRecord
+from app.schemas.user import User
+
+
+class SyncResponse(BaseModel):
+    # Pass back as `since` on the next call; null until the user has any data
+    cursor: Optional[str] = None
+    # True when a page limit was hit; call again with the new cursor
+    has_more: bool = False
+    foods: List[FoodEntry] = []
+    bmi: List[BMIRecord] = []
+    # Ids deleted since the cursor, per collection ("foods", "bmi")
+    deleted: Dict[str, List[int]] = {}
+    # Present when the profile changed since the cursor
+    profile: Optional[User] = None
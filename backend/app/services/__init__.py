@@ -0,0 +1 @@
+# services package
\ No newline at end of file
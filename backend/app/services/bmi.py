@@ -0,0 +1,152 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.caching import BMI, get_version
+from app.models.bmi import BMIRecord
+
+DAY = "day"
+WEEK = "week"
+
+BUCKETS = [DAY, WEEK]
+SERIES = ["weight", "bmi"]
+
+# Trend results per (user_id, params); an entry is valid while the user's bmi
+# version is unchanged, so any insert or delete invalidates it
+CACHE_SIZE = 1024
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def compute_bmi(height_cm: float, weight_kg: float) -> float:
+    """BMI from height in cm and weight in kg, rounded to 2 decimals."""
+    meters = height_cm / 100
+    return round(weight_kg / (meters * meters), 2)
+
+
+def bmi_category(bmi: float) -> str:
+    # Same cut-offs as the app's BMI screen
+    if bmi < 18.5:
+        return "Underweight"
+    if bmi < 25:
+        return "Normal"
+    if bmi < 30:
+        return "Overweight"
+    return "Obese"
+
+
+def _bucket_numbers(days: np.ndarray, bucket: str) -> np.ndarray:
+    if bucket == WEEK:
+        # 1970-01-01 was a Thursday; shift so weeks start on Monday
+        return (days + 3) // 7
+    return days
+
+
+def _bucket_start(number: int, bucket: str) -> str:
+    days = number * 7 - 3 if bucket == WEEK else number
+    return str(np.datetime64(int(days), "D"))
+
+
+def _round(values: np.ndarray) -> list:
+    # NaN (not enough points) becomes null in the JSON response
+    return [None if np.isnan(v) else round(float(v), 3) for v in values]
+
+
+def compute_trend(created_at: list, heights: list, weights: list,
+                  bucket: str = WEEK, window: int = 4, horizon: int = 4) -> dict:
+    """Bucketed weight/BMI series with moving averages, rates and a projection.
+
+    `window` is counted in calendar buckets, so gaps in logging shorten the
+    average instead of stretching it. Rates are per bucket.
+    """
+    heights = np.asarray(heights, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    valid = (heights > 0) & (weights > 0)
+    if not valid.any():
+        return {"bucket": bucket, "window": window, "points": [], "slope": {}, "projection": []}
+
+    days = np.asarray(created_at, dtype="datetime64[D]")[valid].astype(np.int64)
+    heights, weights = heights[valid], weights[valid]
+    # Recompute BMI rather than trusting stored values from older clients
+    values = np.column_stack([weights, weights / (heights / 100) ** 2])
+
+    # Mean per bucket: one unique pass, then bincount per series
+    numbers, inverse, counts = np.unique(_bucket_numbers(days, bucket), return_inverse=True, return_counts=True)
+    means = np.column_stack([
+        np.bincount(inverse, weights=values[:, i], minlength=len(numbers)) for i in range(values.shape[1])
+    ]) / counts[:, None]
+
+    # Moving average over buckets in (n - window, n], via prefix sums
+    prefix = np.vstack([np.zeros((1, means.shape[1])), np.cumsum(means, axis=0)])
+    start = np.searchsorted(numbers, numbers - window, side="right")
+    end = np.arange(1, len(numbers) + 1)
+    averages = (prefix[end] - prefix[start]) / (end - start)[:, None]
+
+    # Rate of change of the smoothed series; gradient handles uneven spacing
+    if len(numbers) > 1:
+        rates = np.gradient(averages, numbers, axis=0)
+    else:
+        rates = np.full_like(averages, np.nan)
+
+    # Linear fit over the last `window` buckets, extended `horizon` buckets
+    recent = numbers >= numbers[-1] - window + 1
+    projection = []
+    slope = {}
+    if recent.sum() > 1:
+        coeffs = np.polyfit(numbers[recent], means[recent], 1)  # shape (2, series)
+        ahead = numbers[-1] + np.arange(1, horizon + 1)
+        projected = ahead[:, None] * coeffs[0] + coeffs[1]
+        slope = dict(zip(SERIES, _round(coeffs[0])))
+        projection = [
+            {"start": _bucket_start(n, bucket), **dict(zip(SERIES, _round(row)))}
+            for n, row in zip(ahead, projected)
+        ]
+
+    points = [
+        {
+            "start": _bucket_start(n, bucket),
+            "records": int(count),
+            **dict(zip(SERIES, _round(mean))),
+            **dict(zip([f"{s}_avg" for s in SERIES], _round(avg))),
+            **dict(zip([f"{s}_rate" for s in SERIES], _round(rate))),
+        }
+        for n, count, mean, avg, rate in zip(numbers, counts, means, averages, rates)
+    ]
+    return {"bucket": bucket, "window": window, "points": points, "slope": slope, "projection": projection}
+
+
+def get_trend(db: Session, user_id: int, bucket: str = WEEK, window: int = 4, horizon: int = 4) -> dict:
+    """compute_trend for a user's records, cached until their BMI data changes."""
+    # Read before the rows, so a cached result is never newer than its version
+    version, _ = get_version(db, user_id, BMI)
+    key = (user_id, bucket, window, horizon)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == version:
+            _cache.move_to_end(key)
+            return cached[1]
+
+    rows = db.query(BMIRecord.created_at, BMIRecord.height, BMIRecord.weight).filter(
+        BMIRecord.user_id == user_id
+    ).all()
+    if rows:
+        created_at, heights, weights = zip(*rows)
+    else:
+        created_at, heights, weights = [], [], []
+    # None heights/weights become NaN and are dropped as invalid
+    result = compute_trend(
+        list(created_at),
+        [np.nan if h is None else h for h in heights],
+        [np.nan if w is None else w for w in weights],
+        bucket, window, horizon,
+    )
+    result["user_id"] = user_id
+
+    with _cache_lock:
+        _cache[key] = (version, result)
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
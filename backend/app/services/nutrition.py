@@ -0,0 +1,30 @@
+import json
+import os
+
+from app.core.config import NUTRITION_DB_PATH
+
+# Nutrient keys in nutrition_db.json that map 1:1 onto FoodEntry columns
+NUTRIENT_FIELDS = [
+    "calories", "protein", "carbs", "fat", "saturated_fat", "fiber",
+    "sugar", "cholesterol", "sodium", "calcium", "iron",
+]
+
+_nutrition_db = None
+
+
+def get_nutrition_db():
+    """Load nutrition_db.json once; an empty dict if backend-ml isn't present."""
+    global _nutrition_db
+    if _nutrition_db is None:
+        if os.path.exists(NUTRITION_DB_PATH):
+            with open(NUTRITION_DB_PATH, "r") as f:
+                _nutrition_db = json.load(f)
+        else:
+            _nutrition_db = {}
+    return _nutrition_db
+
+
+def nutrition_for(label):
+    """FoodEntry nutrient fields for a recognised label (missing values are None)."""
+    info = get_nutrition_db().get(label, {})
+    return {field: info.get(field) for field in NUTRIENT_FIELDS}
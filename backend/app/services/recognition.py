@@ -0,0 +1,71 @@
+import asyncio
+import io
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from app.core.config import ML_DIR, SCAN_POOL, SCAN_WORKERS
+
+_executor = None
+
+
+class InvalidImage(ValueError):
+    """The upload couldn't be decoded as an image."""
+
+
+def _import_inference():
+    # backend-ml isn't a package (hyphenated dir); append so backend's own
+    # `app` package keeps precedence over backend-ml/app.py
+    if ML_DIR not in sys.path:
+        sys.path.append(ML_DIR)
+    import inference
+    return inference
+
+
+def _classify(payload):
+    from PIL import Image  # installed with backend-ml
+
+    inference = _import_inference()
+    # Load first, so a missing model is never reported as a bad image
+    inference.load()
+    try:
+        return inference.classify(io.BytesIO(payload))
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        # PIL's UnidentifiedImageError and truncated-file errors are OSErrors
+        raise InvalidImage(str(e)) from e
+
+
+def _warm_up():
+    _import_inference().load()
+
+
+def get_executor():
+    """Executor that runs inference off the event loop."""
+    global _executor
+    if _executor is None:
+        if SCAN_POOL == "process":
+            # spawn, not fork: TensorFlow must not be inherited across fork
+            _executor = ProcessPoolExecutor(
+                max_workers=SCAN_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_up,
+            )
+        else:
+            _executor = ThreadPoolExecutor(max_workers=SCAN_WORKERS, thread_name_prefix="scan")
+    return _executor
+
+
+async def classify(payload):
+    """Classify image bytes; returns the same dict as backend-ml /predict.
+
+    Raises InvalidImage when the bytes aren't a readable image.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), _classify, payload)
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,194 @@
+import csv
+import os
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import NUTRIENT_TARGETS_PATH
+from app.models.food import FoodEntry
+from app.services.nutrition import NUTRIENT_FIELDS, get_nutrition_db
+
+# Daily targets for users without a listed disease (the app's defaults)
+DEFAULT_TARGETS = {
+    "calories": 2000.0, "protein": 50.0, "carbs": 300.0, "fat": 70.0, "saturated_fat": 20.0,
+    "fiber": 25.0, "sugar": 50.0, "cholesterol": 300.0, "sodium": 2300.0, "calcium": 1000.0,
+    "iron": 18.0,
+}
+
+# Score weights per nutrient, in NUTRIENT_FIELDS order. Filling this meal's
+# share of the remaining budget earns FILL_WEIGHTS; going over it costs OVER_WEIGHTS.
+FILL_WEIGHTS = np.array([1.0, 1.0, 0.25, 0.25, 0.0, 1.0, 0.0, 0.0, 0.0, 0.5, 0.5])
+OVER_WEIGHTS = np.array([2.0, 0.5, 1.0, 1.0, 2.0, 0.0, 2.0, 1.0, 2.0, 0.0, 0.0])
+# Cost per share of the daily target a food uses of a disease-limited nutrient,
+# on top of any overshoot
+LIMITED_WEIGHT = 2.0
+
+# Local hour each meal ends (breakfast, lunch, dinner); the remaining budget is
+# split evenly across the meals still ahead
+MEAL_END_HOURS = (11, 16, 23)
+
+# Nutrients a food must not load heavily, per disease (CSV names)
+DISEASE_LIMITS = {
+    "Diabetes (Type 2)": ["sugar", "carbs"],
+    "Hypertension": ["sodium"],
+    "Obesity": ["calories", "fat", "sugar"],
+    "Cardiovascular Disease": ["saturated_fat", "cholesterol", "sodium"],
+    "Hyperlipidemia": ["saturated_fat", "cholesterol"],
+    "Chronic Kidney Disease (CKD)": ["sodium", "protein"],
+    "PCOS": ["sugar", "carbs"],
+    "Fatty Liver Disease (NAFLD)": ["sugar", "fat", "saturated_fat"],
+    "Metabolic Syndrome": ["sugar", "sodium", "saturated_fat"],
+    "Gout": ["protein"],
+    "IBS / Acid Reflux": ["fat"],
+}
+# With exclusions on, a food is dropped when one serving exceeds this share of
+# the daily target of a nutrient limited for one of the user's diseases
+EXCLUDE_SHARE = 0.3
+
+_foods = None
+
+
+def age_group(age: Optional[int]) -> str:
+    # CSV buckets; under-18s use the youngest adult targets
+    if age is None or age <= 30:
+        return "18-30"
+    return "31-50" if age <= 50 else "51+"
+
+
+@lru_cache(maxsize=1)
+def load_targets() -> Dict[Tuple[str, str], np.ndarray]:
+    """(disease, age group) -> daily target vector in NUTRIENT_FIELDS order."""
+    targets = {}
+    if not os.path.exists(NUTRIENT_TARGETS_PATH):
+        return targets
+    with open(NUTRIENT_TARGETS_PATH, newline="") as f:
+        for row in csv.DictReader(f):
+            # "calories (kcal)" -> "calories"
+            values = {key.split(" (")[0]: value for key, value in row.items()}
+            targets[(values["disease"], values["age_group"])] = np.array(
+                [float(values[field]) for field in NUTRIENT_FIELDS]
+            )
+    return targets
+
+
+def _csv_disease(name: str, known) -> Optional[str]:
+    """Map the app's disease names, e.g. "Hypertension (High Blood Pressure)", to CSV names."""
+    candidates = [
+        name,
+        re.sub(r"\s*\(.*?\)", "", name),      # drop the parenthetical
+        re.sub(r"^.*?\((.*?)\)", r"\1", name),  # keep only the abbreviation
+    ]
+    return next((c.strip() for c in candidates if c.strip() in known), None)
+
+
+@lru_cache(maxsize=256)
+def targets_for(diseases: Tuple[str, ...], group: str) -> Tuple[np.ndarray, Tuple[str, ...]]:
+    """Daily targets for a user and the CSV names of the diseases they matched.
+
+    With several diseases the most conservative (lowest) target wins.
+    """
+    table = load_targets()
+    known = {disease for disease, _ in table}
+    matched = tuple(sorted({d for d in (_csv_disease(name, known) for name in diseases) if d}))
+    if not matched:
+        return np.array([DEFAULT_TARGETS[field] for field in NUTRIENT_FIELDS]), matched
+    return np.min([table[(disease, group)] for disease in matched], axis=0), matched
+
+
+def food_matrix() -> Tuple[List[str], np.ndarray]:
+    """Food names and their (foods, nutrients) per-serving matrix, built once."""
+    global _foods
+    if _foods is None:
+        db = get_nutrition_db()
+        names = sorted(db)
+        matrix = np.array(
+            [[db[name].get(field) or 0.0 for field in NUTRIENT_FIELDS] for name in names],
+            dtype=np.float64,
+        ).reshape(len(names), len(NUTRIENT_FIELDS))
+        _foods = (names, matrix)
+    return _foods
+
+
+def meals_left(local_hour: int) -> int:
+    return max(1, sum(local_hour < end for end in MEAL_END_HOURS))
+
+
+def limited_nutrients(diseases: Tuple[str, ...]) -> List[int]:
+    """NUTRIENT_FIELDS indices limited for any of the (CSV-named) diseases."""
+    return sorted({NUTRIENT_FIELDS.index(n) for d in diseases for n in DISEASE_LIMITS.get(d, [])})
+
+
+def consumed_today(db: Session, user_id: int, utc_offset_minutes: int = 0) -> np.ndarray:
+    """Nutrients logged since the user's local midnight, in one aggregate query."""
+    offset = timedelta(minutes=utc_offset_minutes)
+    local_midnight = (datetime.utcnow() + offset).replace(hour=0, minute=0, second=0, microsecond=0)
+    row = db.query(
+        *[func.coalesce(func.sum(getattr(FoodEntry, field)), 0.0) for field in NUTRIENT_FIELDS]
+    ).filter(
+        FoodEntry.user_id == user_id,
+        FoodEntry.created_at >= local_midnight - offset,
+    ).one()
+    return np.array(row, dtype=np.float64)
+
+
+def score_foods(
+    matrix: np.ndarray, targets: np.ndarray, consumed: np.ndarray, meals: int = 1, limited: List[int] = ()
+) -> np.ndarray:
+    """Score every food against one meal's share of the remaining budget.
+
+    Judged against the whole day, an empty morning leaves room for a serving
+    with most of the day's sodium, so the same food always ranked first.
+    """
+    budget = np.maximum(targets - consumed, 0.0) / targets / meals
+    per_serving = matrix / targets  # share of the daily target
+    fill = np.minimum(per_serving, budget)
+    over = per_serving - fill
+    scores = fill @ FILL_WEIGHTS - over @ OVER_WEIGHTS
+    if len(limited):
+        scores -= per_serving[:, limited].sum(axis=1) * LIMITED_WEIGHT
+    return scores
+
+
+def exclusion_mask(matrix: np.ndarray, targets: np.ndarray, diseases: Tuple[str, ...]) -> np.ndarray:
+    limited = limited_nutrients(diseases)
+    if not limited:
+        return np.zeros(len(matrix), dtype=bool)
+    return (matrix[:, limited] > EXCLUDE_SHARE * targets[limited]).any(axis=1)
+
+
+def recommend(db: Session, user, k: int = 5, exclude: bool = True, utc_offset_minutes: int = 0) -> dict:
+    names, matrix = food_matrix()
+    targets, diseases = targets_for(tuple(user.diseases or ()), age_group(user.age))
+    consumed = consumed_today(db, user.id, utc_offset_minutes)
+    meals = meals_left((datetime.utcnow() + timedelta(minutes=utc_offset_minutes)).hour)
+
+    scores = score_foods(matrix, targets, consumed, meals, limited_nutrients(diseases))
+    excluded = exclusion_mask(matrix, targets, diseases) if exclude else np.zeros(len(names), dtype=bool)
+    scores[excluded] = -np.inf
+
+    # Top-k without sorting every food
+    k = min(k, int((~excluded).sum()))
+    top = np.argpartition(scores, -k)[-k:] if k else np.array([], dtype=int)
+    top = top[np.argsort(scores[top])[::-1]]
+
+    def as_dict(vector):
+        return {field: round(float(value), 2) for field, value in zip(NUTRIENT_FIELDS, vector)}
+
+    return {
+        "diseases": list(diseases),
+        "age_group": age_group(user.age),
+        "targets": as_dict(targets),
+        "consumed": as_dict(consumed),
+        "remaining": as_dict(np.maximum(targets - consumed, 0.0)),
+        "meals_left": meals,
+        "excluded": int(excluded.sum()),
+        "recommendations": [
+            {"food_name": names[i], "score": round(float(scores[i]), 4), "nutrition": as_dict(matrix[i])}
+            for i in top
+        ],
+    }
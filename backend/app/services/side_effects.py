@@ -0,0 +1,24 @@
+import logging
+import os
+
+from app.core.tasks import background_task
+
+logger = logging.getLogger(__name__)
+
+
+def save_upload(image_path: str, payload: bytes) -> None:
+    """Write an uploaded image; a temp file + rename means readers never see half a file.
+
+    Called before the row referencing it is committed, not queued: a path in
+    the database must always resolve.
+    """
+    os.makedirs(os.path.dirname(image_path), exist_ok=True)
+    tmp_path = f"{image_path}.part"
+    with open(tmp_path, "wb") as buffer:
+        buffer.write(payload)
+    os.replace(tmp_path, image_path)
+
+
+@background_task
+def log_profile_update(user_id: int, preferred_mode: str, changes: dict) -> None:
+    logger.info("Updated user %s (mode %s): %s", user_id, preferred_mode, changes)
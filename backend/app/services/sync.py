@@ -0,0 +1,124 @@
+import base64
+import json
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import String, or_, type_coerce
+from sqlalchemy.orm import Session
+
+from app.models.bmi import BMIRecord
+from app.models.food import FoodEntry
+from app.models.tombstone import Tombstone
+from app.models.user import User
+from app.core.caching import BMI, FOODS
+
+FOOD_FIELDS = [
+    "id", "user_id", "food_name", "mode", "calories", "protein", "carbs", "fat",
+    "saturated_fat", "fiber", "sugar", "cholesterol", "sodium", "calcium", "iron",
+    "image_path", "created_at", "updated_at",
+]
+BMI_FIELDS = ["id", "user_id", "height", "weight", "bmi", "bmi_category", "mode", "created_at", "updated_at"]
+PROFILE_FIELDS = [
+    "id", "email", "full_name", "age", "gender", "height", "weight",
+    "preferred_mode", "diseases", "created_at", "updated_at",
+]
+
+COLLECTIONS = {
+    FOODS: (FoodEntry, FOOD_FIELDS),
+    BMI: (BMIRecord, BMI_FIELDS),
+}
+DELETED = "deleted"
+PROFILE = "profile"
+STREAMS = [FOODS, BMI, DELETED, PROFILE]
+
+# Last (timestamp, id) a client has received from one stream. The timestamp is
+# the text SQLite stores, so it binds back in exactly the stored format.
+Position = Tuple[str, int]
+
+
+def encode_cursor(positions: Dict[str, Position]) -> str:
+    payload = {stream: [ts, row_id] for stream, (ts, row_id) in positions.items()}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Position]:
+    """Inverse of encode_cursor; raises ValueError on anything malformed."""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        positions = {
+            stream: (str(ts), int(row_id))
+            for stream, (ts, row_id) in json.loads(base64.urlsafe_b64decode(padded.encode()).decode()).items()
+            if stream in STREAMS
+        }
+        for ts, _ in positions.values():
+            datetime.fromisoformat(ts)
+    except (AttributeError, TypeError) as e:
+        raise ValueError("Malformed sync cursor") from e
+    return positions
+
+
+def record_deletion(db: Session, user_id: int, collection: str, record_id: int) -> None:
+    """Leave a tombstone for a deleted record; commit with the delete itself."""
+    db.add(Tombstone(user_id=user_id, collection=collection, record_id=record_id))
+
+
+def _page(query, ts_column, id_column, position: Optional[Position], limit: int):
+    """Rows after `position` in (timestamp, id) order; returns (rows, True if cut off).
+
+    Each row gets a `position_ts` column: the stored timestamp text, which the
+    next position is built from.
+    """
+    # Compare the stored text itself, never a re-formatted datetime: SQLite
+    # compares text, and "…05.233" < "…05.233000" would drop tied rows
+    stored_ts = type_coerce(ts_column, String)
+    query = query.add_columns(stored_ts.label("position_ts"))
+    if position is not None:
+        ts, last_id = position
+        # Seek on the (user_id, timestamp) index; the id orders rows that share a timestamp
+        query = query.filter(stored_ts >= ts, or_(stored_ts > ts, id_column > last_id))
+    rows = query.order_by(ts_column, id_column).limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
+
+
+def changes_since(db: Session, user: User, since: Optional[Dict[str, Position]], limit: int) -> dict:
+    """Rows created, updated or deleted after the cursor positions (everything when None).
+
+    Each stream (foods, bmi, deletions) returns at most `limit` rows, oldest
+    change first, and keeps its own (timestamp, id) position in the cursor.
+    Rows that share a timestamp are ordered by id, so a page boundary inside a
+    tie neither skips nor repeats rows.
+    """
+    result = {"foods": [], "bmi": [], "deleted": {FOODS: [], BMI: []}, "profile": None}
+    positions = dict(since or {})
+    has_more = False
+
+    for collection, (model, fields) in COLLECTIONS.items():
+        query = db.query(*[getattr(model, f) for f in fields]).filter(model.user_id == user.id)
+        rows, cut_off = _page(query, model.updated_at, model.id, positions.get(collection), limit)
+        has_more = has_more or cut_off
+        if rows:
+            positions[collection] = (rows[-1].position_ts, rows[-1].id)
+        result[collection] = [dict(zip(fields, row)) for row in rows]
+
+    query = db.query(Tombstone.id, Tombstone.collection, Tombstone.record_id, Tombstone.deleted_at).filter(
+        Tombstone.user_id == user.id
+    )
+    tombstones, cut_off = _page(query, Tombstone.deleted_at, Tombstone.id, positions.get(DELETED), limit)
+    has_more = has_more or cut_off
+    for _, collection, record_id, _, _ in tombstones:
+        result["deleted"].setdefault(collection, []).append(record_id)
+    if tombstones:
+        positions[DELETED] = (tombstones[-1].position_ts, tombstones[-1].id)
+
+    profile_changed_at = user.updated_at or user.created_at
+    if profile_changed_at is not None:
+        profile_changed_at = profile_changed_at.replace(tzinfo=None)
+    seen = positions.get(PROFILE)
+    if seen is None or (profile_changed_at is not None and profile_changed_at > datetime.fromisoformat(seen[0])):
+        result["profile"] = {f: getattr(user, f) for f in PROFILE_FIELDS}
+        if profile_changed_at is not None:
+            positions[PROFILE] = (profile_changed_at.isoformat(sep=" "), user.id)
+
+    result["cursor"] = encode_cursor(positions) if positions else None
+    result["has_more"] = has_more
+    return result
@@ -9,12 +9,24 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app.api.auth import router as auth_router
 from app.api.auth import user_router
-from app.api import bmi_router, food_router
+from app.api import bmi_router, food_router, recommendation_router, sync_router
 from app.db.database import create_tables
+from app.core.config import SCAN_ENABLED
+from app.core.metrics import instrument_serialization, metrics_middleware, metrics_response
+from app.core.profiling import profiling_middleware
+from app.core.ratelimit import rate_limit_middleware
+from app.core.tasks import task_queue
 
 app = FastAPI(title="BhojanBuddy API")
 
-# Configure CORS
+# Per-route latency histograms and the opt-in per-request profiler
+app.middleware("http")(metrics_middleware)
+app.middleware("http")(profiling_middleware)
+# Runs before everything but CORS: rejected requests never reach a handler
+app.middleware("http")(rate_limit_middleware)
+
+# Configure CORS. Added last so it wraps the rate limiter and 429s carry the
+# headers a browser needs to read them
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # In production, replace with specific origins
@@ -22,12 +34,26 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+instrument_serialization()
 
 # Include routers
 app.include_router(auth_router.router, prefix="/auth", tags=["Authentication"])
 app.include_router(user_router.router, prefix="/users", tags=["Users"])
 app.include_router(bmi_router.router, prefix="/api/bmi", tags=["BMI"])
 app.include_router(food_router.router, prefix="/foods", tags=["Foods"])
+app.include_router(sync_router.router, prefix="/sync", tags=["Sync"])
+app.include_router(recommendation_router.router, prefix="/foods", tags=["Recommendations"])
+
+# Optional in-process food recognition (scan and log in one upload)
+if SCAN_ENABLED:
+    from app.api import scan_router
+    from app.services import recognition
+
+    app.include_router(scan_router.router, prefix="/foods", tags=["Scan"])
+
+    @app.on_event("shutdown")
+    async def shutdown_recognition():
+        recognition.shutdown()
 
 # Create uploads directory if it doesn't exist
 os.makedirs("uploads/food_images", exist_ok=True)
@@ -38,11 +64,21 @@ app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 @app.on_event("startup")
 async def startup_event():
     create_tables()
+    await task_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Finish queued side effects before the process exits
+    await task_queue.stop()
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to BhojanBuddy API"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return metrics_response()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=5000, reload=True)
\ No newline at end of file
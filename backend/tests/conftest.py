@@ -0,0 +1,32 @@
+import os
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+# The engine opens ./bhojanbuddy.db when app.db is first imported, so every
+# test session gets its own scratch directory before anything imports the app
+os.chdir(tempfile.mkdtemp(prefix="bhojanbuddy-tests-"))
+os.environ["BHOJANBUDDY_RATE_LIMIT"] = "0"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def user(client):
+    """A fresh registered user: (id, auth headers)."""
+    email = f"{uuid.uuid4().hex[:12]}@example.com"
+    client.post("/auth/register", json={"email": email, "full_name": "Test", "password": "pw"})
+    token = client.post("/auth/login", data={"username": email, "password": "pw"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    return client.get("/users/me", headers=headers).json()["id"], headers
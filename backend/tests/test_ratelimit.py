@@ -0,0 +1,33 @@
+import pytest
+
+from app.core import ratelimit
+
+
+@pytest.mark.parametrize("spec, expected", [
+    ("30/minute", (30.0, 0.5)),
+    ("5", (5.0, 5.0)),
+    (" 2 / Second ", (2.0, 2.0)),
+    ("off", None),
+    ("0", None),
+])
+def test_parse_limit(spec, expected):
+    assert ratelimit.parse_limit(spec) == expected
+
+
+@pytest.mark.parametrize("spec", ["0/minute", "-1/minute", "0.5/minute", "inf/minute", "nan/minute",
+                                  "abc/minute", "10/fortnight", "10/minutes"])
+def test_parse_limit_rejects_bad_specs(spec):
+    with pytest.raises(ValueError, match="Rate limit"):
+        ratelimit.parse_limit(spec)
+
+
+def test_rejection_carries_cors_headers(client, monkeypatch):
+    limiter = ratelimit.RateLimiter({ratelimit.READS: "1/hour"})
+    monkeypatch.setattr(ratelimit, "rate_limiter", limiter)
+    headers = {"Origin": "https://app.example.com"}
+
+    assert client.get("/users/me", headers=headers).status_code != 429
+    response = client.get("/users/me", headers=headers)
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) > 0
+    assert response.headers["access-control-allow-origin"] in ("*", "https://app.example.com")
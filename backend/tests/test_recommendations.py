@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from app.services import recommendations
+from app.services.nutrition import NUTRIENT_FIELDS
+
+WATCHED = ("sodium", "sugar")
+
+
+def heavy(matrix, targets, rows, nutrients):
+    """Rows whose serving holds more than EXCLUDE_SHARE of a nutrient's daily target."""
+    columns = [NUTRIENT_FIELDS.index(n) for n in nutrients]
+    share = matrix[np.ix_(rows, columns)] / targets[columns]
+    return [row for row, over in zip(rows, (share > recommendations.EXCLUDE_SHARE).any(axis=1)) if over]
+
+
+@pytest.mark.parametrize("disease", [d for d, limits in recommendations.DISEASE_LIMITS.items()
+                                     if set(limits) & set(WATCHED)])
+@pytest.mark.parametrize("group", ["18-30", "31-50", "51+"])
+@pytest.mark.parametrize("meals", [1, 2, 3])
+def test_limited_user_top_k_skips_heavy_foods_without_exclusions(disease, group, meals):
+    names, matrix = recommendations.food_matrix()
+    targets, matched = recommendations.targets_for((disease,), group)
+    assert matched == (disease,)
+
+    scores = recommendations.score_foods(
+        matrix, targets, np.zeros(len(NUTRIENT_FIELDS)), meals, recommendations.limited_nutrients(matched)
+    )
+    top = list(np.argsort(scores)[::-1][:5])
+    watched = [n for n in recommendations.DISEASE_LIMITS[disease] if n in WATCHED]
+    assert [names[i] for i in heavy(matrix, targets, top, watched)] == []
+
+
+def test_empty_day_is_split_across_meals(client, user):
+    user_id, headers = user
+    client.put("/users/me", json={"age": 40, "diseases": ["Hypertension (High Blood Pressure)"]}, headers=headers)
+
+    body = client.get(f"/foods/recommendations/{user_id}?k=5&exclude=false", headers=headers).json()
+    assert 1 <= body["meals_left"] <= 3
+    assert body["diseases"] == ["Hypertension"]
+    sodium_target = body["targets"]["sodium"]
+    for item in body["recommendations"]:
+        assert item["nutrition"]["sodium"] <= recommendations.EXCLUDE_SHARE * sodium_target
@@ -0,0 +1,68 @@
+from sqlalchemy import text
+
+
+def log_food(client, user_id, headers, name):
+    response = client.post("/foods/log", headers=headers, data={
+        "user_id": user_id, "food_name": name, "calories": 1, "protein": 1, "carbs": 1, "fat": 1,
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def set_updated_at(user_id, value_sql):
+    from app.db.database import engine
+
+    with engine.begin() as conn:
+        conn.execute(text(f"UPDATE food_entries SET updated_at = {value_sql} WHERE user_id = :u"), {"u": user_id})
+
+
+def drain(client, headers, limit):
+    """Page /sync until has_more is false; returns (food ids in order, final cursor)."""
+    ids, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"since": cursor} if cursor else {})}
+        page = client.get("/sync/", headers=headers, params=params).json()
+        ids += [food["id"] for food in page["foods"]]
+        cursor = page["cursor"]
+        if not page["has_more"]:
+            return ids, cursor
+
+
+def test_tie_across_page_boundary(client, user):
+    user_id, headers = user
+    expected = [log_food(client, user_id, headers, f"food {i}") for i in range(5)]
+    # One statement: every row gets the same utc_now_ms() value
+    set_updated_at(user_id, "strftime('%Y-%m-%d %H:%M:%f', 'now')")
+
+    ids, cursor = drain(client, headers, limit=2)
+
+    assert ids == expected
+    assert client.get("/sync/", headers=headers, params={"since": cursor}).json()["foods"] == []
+
+
+def test_tie_at_second_resolution(client, user):
+    # Rows backfilled with created_at before migration 5 carry no fraction
+    user_id, headers = user
+    expected = [log_food(client, user_id, headers, f"food {i}") for i in range(4)]
+    set_updated_at(user_id, "'2026-01-01 00:00:05'")
+
+    ids, _ = drain(client, headers, limit=3)
+
+    assert ids == expected
+
+
+def test_change_after_cursor_is_sent_once(client, user):
+    user_id, headers = user
+    log_food(client, user_id, headers, "first")
+    _, cursor = drain(client, headers, limit=1)
+    second = log_food(client, user_id, headers, "second")
+
+    page = client.get("/sync/", headers=headers, params={"since": cursor}).json()
+
+    assert [food["id"] for food in page["foods"]] == [second]
+
+
+def test_malformed_cursor_is_rejected(client, user):
+    _, headers = user
+    for cursor in ["zzz", "WzFd", "eyJmb29kcyI6WyJ4IiwxXX0"]:  # junk, [1], {"foods":["x",1]}
+        assert client.get("/sync/", headers=headers, params={"since": cursor}).status_code == 400
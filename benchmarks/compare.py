@@ -0,0 +1,41 @@
+"""Compare two benchmark reports from run.py (e.g. before/after a commit).
+
+    python benchmarks/compare.py base.json head.json
+"""
+import argparse
+import json
+
+
+def pct_change(old, new):
+    if old in (None, 0) or new is None:
+        return None
+    return (new - old) / old * 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base")
+    parser.add_argument("head")
+    args = parser.parse_args()
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+
+    print(f"base {base['meta'].get('git_revision')}  ->  head {head['meta'].get('git_revision')}")
+    if base["meta"]["params"] != head["meta"]["params"]:
+        print("warning: reports were produced with different parameters")
+    print(f"{'scenario':<16}{'metric':<16}{'base':>12}{'head':>12}{'change':>10}")
+    for name in sorted(set(base["scenarios"]) & set(head["scenarios"])):
+        b, h = base["scenarios"][name], head["scenarios"][name]
+        rows = [("throughput_rps", b["throughput_rps"], h["throughput_rps"])]
+        rows += [(f"{p}_ms", b["latency_ms"][p], h["latency_ms"][p]) for p in ("p50", "p95", "p99")]
+        for metric, old, new in rows:
+            change = pct_change(old, new)
+            change_text = f"{change:+.1f}%" if change is not None else "n/a"
+            print(f"{name:<16}{metric:<16}{old if old is not None else '-':>12}{new if new is not None else '-':>12}{change_text:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import http.client
+import statistics
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+
+def multipart(fields, files):
+    """Encode form `fields` and `files` ({name: (filename, bytes, type)})."""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        )
+    for name, (filename, payload, content_type) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n".encode() + payload + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def drive(base_url, make_request, requests, concurrency, timeout=60.0):
+    """Send `requests` requests from `concurrency` keep-alive clients.
+
+    `make_request(i)` returns (method, path, body, headers) for request i.
+    Returns throughput, latency percentiles (ms) and status counts.
+    """
+    url = urlsplit(base_url)
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def worker():
+        conn = http.client.HTTPConnection(url.hostname, url.port, timeout=timeout)
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            method, path, body, headers = make_request(i)
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+                resp.read()
+                status = resp.status
+            except Exception:
+                status = "error"
+                conn.close()
+                conn = http.client.HTTPConnection(url.hostname, url.port, timeout=timeout)
+            elapsed = time.perf_counter() - started
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+                if isinstance(status, int) and status < 400:
+                    latencies.append(elapsed)
+        conn.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    ms = [v * 1000 for v in latencies]
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "ok": len(latencies),
+        "status_counts": {str(k): v for k, v in sorted(statuses.items(), key=str)},
+        "wall_seconds": round(wall, 4),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.fmean(ms), 3) if ms else None,
+            "p50": round(percentile(ms, 50), 3) if ms else None,
+            "p95": round(percentile(ms, 95), 3) if ms else None,
+            "p99": round(percentile(ms, 99), 3) if ms else None,
+            "max": round(ms[-1], 3) if ms else None,
+        },
+    }
@@ -0,0 +1,130 @@
+"""Query-plan regression check for the API's SQL.
+
+Seeds a synthetic database, calls every router endpoint through the FastAPI
+TestClient, captures the SQL each one runs and asks SQLite for its plan with
+`EXPLAIN QUERY PLAN`. Exits non-zero when a query on a hot table falls back to
+a full table scan or sorts rows in a temporary B-tree.
+
+    python benchmarks/query_plans.py --users 50 --entries 2000 --bmi 200
+"""
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Tables that grow with usage; a SCAN of any of them is a regression
+HOT_TABLES = {"users", "food_entries", "bmi_records", "tombstones", "user_data_versions"}
+SCAN = re.compile(r"^SCAN (\w+)")
+
+
+def capture(engine, statements):
+    """Record (endpoint, sql, parameters) for every query sent to SQLite."""
+    from sqlalchemy import event
+
+    current = {"endpoint": None}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if current["endpoint"] and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            statements.append((current["endpoint"], statement, parameters))
+
+    return current
+
+
+def exercise(client, current):
+    """Call each endpoint as seeded user 1."""
+    def call(endpoint, method, url, **kwargs):
+        current["endpoint"] = endpoint
+        response = client.request(method, url, **kwargs)
+        current["endpoint"] = None
+        if response.status_code >= 400:
+            raise RuntimeError(f"{endpoint}: HTTP {response.status_code} {response.text[:200]}")
+        return response
+
+    from seed import PASSWORD, user_email
+
+    token = call("POST /auth/login", "POST", "/auth/login",
+                 data={"username": user_email(1), "password": PASSWORD}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    call("GET /users/me", "GET", "/users/me", headers=headers)
+    call("GET /users/{id}", "GET", "/users/1", headers=headers)
+    call("GET /foods/history", "GET", "/foods/history/1", headers=headers)
+    call("GET /foods/history?format=columnar", "GET", "/foods/history/1?format=columnar", headers=headers)
+    call("GET /foods/recommendations", "GET", "/foods/recommendations/1", headers=headers)
+    call("GET /api/bmi", "GET", "/api/bmi/1", headers=headers)
+    call("GET /api/bmi/trend", "GET", "/api/bmi/1/trend", headers=headers)
+    record = call("POST /api/bmi", "POST", "/api/bmi/", headers=headers,
+                  json={"user_id": 1, "height": 170, "weight": 70}).json()
+    call("DELETE /api/bmi/records", "DELETE", f"/api/bmi/records/{record['id']}", headers=headers)
+    cursor = call("GET /sync", "GET", "/sync/", headers=headers).json()["cursor"]
+    call("GET /sync?since", "GET", "/sync/", params={"since": cursor}, headers=headers)
+
+
+def problems(plan):
+    found = []
+    for detail in plan:
+        match = SCAN.match(detail)
+        if match and match.group(1) in HOT_TABLES:
+            found.append(detail)
+        elif detail.startswith("USE TEMP B-TREE"):
+            found.append(detail)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--entries", type=int, default=2000, help="food entries per user")
+    parser.add_argument("--bmi", type=int, default=200, help="BMI records per user")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # The backend's engine resolves ./bhojanbuddy.db when app.db is first
+    # imported (seed imports it too), so move to the scratch directory first
+    workdir = tempfile.mkdtemp(prefix="bhojanbuddy-plans-")
+    os.chdir(workdir)
+    os.environ["BHOJANBUDDY_RATE_LIMIT"] = "0"
+
+    from fastapi.testclient import TestClient
+
+    from seed import PASSWORD, seed, user_email
+
+    db_path = os.path.join(workdir, "bhojanbuddy.db")
+    print(f"Seeding {db_path}")
+    seed(db_path, args.users, args.entries, args.bmi, args.seed)
+
+    import main as backend
+    from app.db.database import engine
+
+    statements = []
+    current = capture(engine, statements)
+    with TestClient(backend.app) as client:
+        exercise(client, current)
+
+    conn = sqlite3.connect(db_path)
+    failures = 0
+    seen = set()
+    for endpoint, sql, parameters in statements:
+        if (endpoint, sql) in seen:
+            continue
+        seen.add((endpoint, sql))
+        plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", parameters)]
+        bad = problems(plan)
+        failures += bool(bad)
+        print(f"\n[{'FAIL' if bad else 'ok'}] {endpoint}")
+        print("  " + " ".join(sql.split()))
+        for detail in plan:
+            print(f"    {'!!' if detail in bad else '  '} {detail}")
+    conn.close()
+
+    print(f"\n{len(seen)} queries checked, {failures} with full scans or temp sorts")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""End-to-end benchmark for the BhojanBuddy API and inference paths.
+
+Seeds a synthetic database in a scratch directory, starts the FastAPI backend
+(and optionally backend-ml) on localhost, drives each endpoint at a fixed
+concurrency and writes a JSON report. Everything runs offline on CPU.
+
+    python benchmarks/run.py --users 50 --entries 1000 --requests 300 --concurrency 8 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from http_load import drive, multipart  # noqa: E402
+from seed import BACKEND_DIR, PASSWORD, ROOT_DIR, seed, user_email  # noqa: E402
+from synthetic_images import make_food_images  # noqa: E402
+
+ML_DIR = os.path.join(ROOT_DIR, "backend-ml")
+# What backend-ml serving reads from its model directory
+ML_MODEL_FILES = ["food_model.h5", "label_map.json", "nutrition_db.json", "label_table.npy", "calibration.json"]
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def wait_for(url, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=2) as resp:
+                if resp.status == 200:
+                    return
+        except Exception:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
+
+def process_tree_rss_kb(pid):
+    """Current and peak RSS (KiB) summed over `pid` and its children (Linux /proc)."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+                children.setdefault(ppid, []).append(int(entry))
+            except (OSError, IndexError, ValueError):
+                continue
+    rss = hwm = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        stack.extend(children.get(current, []))
+        try:
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        rss += int(line.split()[1])
+                    elif line.startswith("VmHWM:"):
+                        hwm += int(line.split()[1])
+        except OSError:
+            continue
+    return {"rss_kb": rss, "peak_rss_kb": hwm}
+
+
+def start_backend(workdir, port, workers):
+    # Rate limiting would turn most of the load into 429s
+    env = dict(os.environ, BHOJANBUDDY_RATE_LIMIT="0")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", BACKEND_DIR,
+         "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=workdir, env=env,
+    )
+
+
+def start_ml(workdir, port, workers):
+    # Serve a copy of the model files and save uploads in the scratch directory,
+    # so the run never writes into backend-ml/model or backend-ml/data
+    model_dir = os.path.join(workdir, "ml-model")
+    os.makedirs(model_dir, exist_ok=True)
+    for name in ML_MODEL_FILES:
+        if os.path.exists(os.path.join(ML_DIR, "model", name)):
+            shutil.copy2(os.path.join(ML_DIR, "model", name), model_dir)
+    env = dict(
+        os.environ,
+        BHOJANBUDDY_ML_WORKERS=str(workers),
+        BHOJANBUDDY_ML_MODEL_DIR=model_dir,
+        BHOJANBUDDY_ML_DATA_DIR=os.path.join(workdir, "ml-data"),
+        BHOJANBUDDY_RATE_LIMIT="0",
+        TF_CPP_MIN_LOG_LEVEL="3",
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "-b", f"127.0.0.1:{port}", "app:app"],
+        cwd=ML_DIR, env=env,
+    )
+
+
+def access_token(email):
+    # Mint tokens directly so setup doesn't pay bcrypt once per user
+    sys.path.insert(0, BACKEND_DIR)
+    from app.core.security import create_access_token
+    return create_access_token({"sub": email})
+
+
+def api_scenarios(args, images):
+    rng = random.Random(args.seed)
+    tokens = {uid: access_token(user_email(uid)) for uid in range(1, args.users + 1)}
+
+    def pick_user(i):
+        uid = rng.randint(1, args.users)
+        return uid, {"Authorization": f"Bearer {tokens[uid]}"}
+
+    def login(i):
+        uid = rng.randint(1, args.users)
+        body = urlencode({"username": user_email(uid), "password": PASSWORD})
+        return "POST", "/auth/login", body, {"Content-Type": "application/x-www-form-urlencoded"}
+
+    def foods_log(i):
+        uid, headers = pick_user(i)
+        fields = {"user_id": uid, "food_name": "idli", "calories": 58, "protein": 2, "carbs": 12, "fat": 0.4}
+        files = {"image": (f"bench_{i}.jpg", images[i % len(images)], "image/jpeg")} if args.log_images else {}
+        body, content_type = multipart(fields, files)
+        return "POST", "/foods/log", body, {**headers, "Content-Type": content_type}
+
+    def foods_history(i):
+        uid, headers = pick_user(i)
+        return "GET", f"/foods/history/{uid}", None, headers
+
+    def bmi_history(i):
+        uid, headers = pick_user(i)
+        return "GET", f"/api/bmi/{uid}", None, headers
+
+    def bmi_create(i):
+        uid, headers = pick_user(i)
+        body = json.dumps({"user_id": uid, "height": 170, "weight": 70, "bmi": 24.2,
+                           "bmi_category": "Normal", "mode": "swasthya"})
+        return "POST", "/api/bmi/", body, {**headers, "Content-Type": "application/json"}
+
+    return {
+        "auth_login": (login, args.login_requests),
+        "foods_log": (foods_log, args.requests),
+        "foods_history": (foods_history, args.requests),
+        "bmi_history": (bmi_history, args.requests),
+        "bmi_create": (bmi_create, args.requests),
+    }
+
+
+def predict_scenario(images):
+    def predict(i):
+        body, content_type = multipart({}, {"image": (f"bench_{i % len(images)}.jpg", images[i % len(images)], "image/jpeg")})
+        return "POST", "/predict", body, {"Content-Type": content_type}
+    return predict
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--entries", type=int, default=1000, help="food entries per user")
+    parser.add_argument("--bmi", type=int, default=100, help="BMI records per user")
+    parser.add_argument("--requests", type=int, default=300, help="requests per scenario")
+    parser.add_argument("--login-requests", type=int, default=50, help="requests for the bcrypt-bound login scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=20, help="untimed requests per scenario")
+    parser.add_argument("--workers", type=int, default=1, help="server worker processes")
+    parser.add_argument("--scenarios", help="comma-separated subset to run")
+    parser.add_argument("--log-images", action="store_true", help="attach an image to every /foods/log")
+    parser.add_argument("--skip-ml", action="store_true", help="don't start backend-ml / run /predict")
+    parser.add_argument("--api-port", type=int, default=18000)
+    parser.add_argument("--ml-port", type=int, default=18001)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch directory")
+    parser.add_argument("--output", help="write the JSON report here as well as stdout")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bhojanbuddy-bench-")
+    images = make_food_images(16, seed=args.seed)
+    report = {
+        "meta": {
+            "git_revision": git_revision(),
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "params": {k: v for k, v in vars(args).items() if k not in ("output", "keep")},
+        },
+        "dataset": None,
+        "scenarios": {},
+        "memory": {},
+    }
+    wanted = set(args.scenarios.split(",")) if args.scenarios else None
+
+    api = ml = None
+    try:
+        started = time.perf_counter()
+        report["dataset"] = seed(os.path.join(workdir, "bhojanbuddy.db"), args.users, args.entries, args.bmi, args.seed)
+        report["dataset"]["seed_seconds"] = round(time.perf_counter() - started, 3)
+
+        api = start_backend(workdir, args.api_port, args.workers)
+        api_url = f"http://127.0.0.1:{args.api_port}"
+        wait_for(api_url + "/", 60)
+        report["memory"]["api_idle"] = process_tree_rss_kb(api.pid)
+
+        for name, (make_request, count) in api_scenarios(args, images).items():
+            if wanted and name not in wanted:
+                continue
+            if args.warmup:
+                drive(api_url, make_request, args.warmup, 1)
+            report["scenarios"][name] = drive(api_url, make_request, count, args.concurrency)
+            print(f"{name}: {report['scenarios'][name]['throughput_rps']} req/s", file=sys.stderr)
+        report["memory"]["api_after"] = process_tree_rss_kb(api.pid)
+
+        if not args.skip_ml and (not wanted or "predict" in wanted):
+            ml = start_ml(workdir, args.ml_port, args.workers)
+            ml_url = f"http://127.0.0.1:{args.ml_port}"
+            wait_for(ml_url + "/readyz", 300)
+            report["memory"]["ml_idle"] = process_tree_rss_kb(ml.pid)
+            make_request = predict_scenario(images)
+            if args.warmup:
+                drive(ml_url, make_request, args.warmup, 1)
+            report["scenarios"]["predict"] = drive(ml_url, make_request, args.requests, args.concurrency)
+            print(f"predict: {report['scenarios']['predict']['throughput_rps']} req/s", file=sys.stderr)
+            report["memory"]["ml_after"] = process_tree_rss_kb(ml.pid)
+    finally:
+        for proc in (api, ml):
+            if proc is not None:
+                proc.terminate()
+                try:
+                    proc.wait(timeout=30)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
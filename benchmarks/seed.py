@@ -0,0 +1,122 @@
+"""Seed a synthetic BhojanBuddy SQLite database for benchmarking.
+
+    python benchmarks/seed.py --db /tmp/bench/bhojanbuddy.db --users 100 --entries 500 --bmi 50
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(ROOT_DIR, "backend")
+NUTRITION_DB_PATH = os.path.join(ROOT_DIR, "backend-ml", "model", "nutrition_db.json")
+sys.path.insert(0, BACKEND_DIR)
+
+from sqlalchemy import create_engine  # noqa: E402
+
+from app.db.migrations import migrate  # noqa: E402
+from app.models.bmi import BMIRecord  # noqa: E402
+from app.models.food import FoodEntry  # noqa: E402
+from app.models.user import ModeType, User  # noqa: E402
+from app.core.security import get_password_hash  # noqa: E402
+
+PASSWORD = "benchmark"
+DISEASES = ["Diabetes (Type 2)", "Hypertension", "Heart Disease", "Obesity"]
+NUTRIENTS = ["calories", "protein", "carbs", "fat", "saturated_fat", "fiber",
+             "sugar", "cholesterol", "sodium", "calcium", "iron"]
+
+
+def user_email(i):
+    return f"user{i}@bench.example.com"
+
+
+def seed(db_path, users, entries, bmi_records, seed=0, days=365):
+    """Create the schema and bulk-insert synthetic rows; returns row counts."""
+    rng = random.Random(seed)
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    engine = create_engine(f"sqlite:///{db_path}")
+    migrate(engine)
+
+    with open(NUTRITION_DB_PATH) as f:
+        foods = list(json.load(f).items())
+
+    # bcrypt is deliberately slow; every synthetic user shares one hash
+    hashed = get_password_hash(PASSWORD)
+    now = datetime.utcnow()
+
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {
+                "id": i,
+                "email": user_email(i),
+                "full_name": f"Bench User {i}",
+                "hashed_password": hashed,
+                "age": rng.randint(18, 80),
+                "gender": rng.choice(["male", "female"]),
+                "height": round(rng.uniform(150, 190), 1),
+                "weight": round(rng.uniform(45, 110), 1),
+                "preferred_mode": rng.choice(list(ModeType)),
+                "diseases": rng.sample(DISEASES, rng.randint(0, 2)),
+                "created_at": now - timedelta(days=days),
+            }
+            for i in range(1, users + 1)
+        ])
+
+        batch = []
+        for user_id in range(1, users + 1):
+            for _ in range(entries):
+                name, info = rng.choice(foods)
+                row = {
+                    "user_id": user_id,
+                    "food_name": name,
+                    "image_path": None,
+                    "mode": rng.choice(list(ModeType)),
+                    "created_at": now - timedelta(seconds=rng.randint(0, days * 86400)),
+                }
+                row.update({n: info.get(n) for n in NUTRIENTS})
+                batch.append(row)
+            if len(batch) >= 50000:
+                conn.execute(FoodEntry.__table__.insert(), batch)
+                batch = []
+        if batch:
+            conn.execute(FoodEntry.__table__.insert(), batch)
+
+        rows = []
+        for user_id in range(1, users + 1):
+            height = rng.uniform(150, 190)
+            weight = rng.uniform(45, 110)
+            for _ in range(bmi_records):
+                weight = max(35.0, weight + rng.uniform(-1.0, 1.0))
+                bmi = weight / (height / 100) ** 2
+                rows.append({
+                    "user_id": user_id,
+                    "height": round(height, 1),
+                    "weight": round(weight, 1),
+                    "bmi": round(bmi, 1),
+                    "bmi_category": "Normal" if 18.5 <= bmi < 25 else ("Underweight" if bmi < 18.5 else "Overweight"),
+                    "mode": rng.choice(list(ModeType)),
+                    "created_at": now - timedelta(seconds=rng.randint(0, days * 86400)),
+                })
+        if rows:
+            conn.execute(BMIRecord.__table__.insert(), rows)
+
+    engine.dispose()
+    return {"users": users, "food_entries": users * entries, "bmi_records": users * bmi_records}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", required=True, help="SQLite file to (re)create")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--entries", type=int, default=500, help="food entries per user")
+    parser.add_argument("--bmi", type=int, default=50, help="BMI records per user")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps(seed(args.db, args.users, args.entries, args.bmi, args.seed)))
+
+
+if __name__ == "__main__":
+    main()
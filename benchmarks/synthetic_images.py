@@ -0,0 +1,30 @@
+import io
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+
+def make_food_images(count, size=(640, 480), seed=0):
+    """Deterministic JPEGs of a plate with a few coloured blobs on a noisy table.
+
+    Real photos compress to similar sizes, unlike flat colours, so upload and
+    decode costs stay realistic.
+    """
+    rng = np.random.default_rng(seed)
+    width, height = size
+    images = []
+    for _ in range(count):
+        table = rng.integers(60, 140, size=(height, width, 3), dtype=np.uint8)
+        img = Image.fromarray(table)
+        draw = ImageDraw.Draw(img)
+        cx, cy, r = width // 2, height // 2, int(min(width, height) * 0.42)
+        draw.ellipse((cx - r, cy - r, cx + r, cy + r), fill=(235, 235, 230))
+        for _ in range(rng.integers(2, 6)):
+            bx, by = rng.integers(cx - r // 2, cx + r // 2), rng.integers(cy - r // 2, cy + r // 2)
+            br = int(rng.integers(r // 6, r // 3))
+            color = tuple(int(c) for c in rng.integers(40, 230, size=3))
+            draw.ellipse((bx - br, by - br, bx + br, by + br), fill=color)
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=85)
+        images.append(buf.getvalue())
+    return images